@@ -0,0 +1,175 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#
+# Implements expired internet draft
+#  http://www.robotstxt.org/norobots-rfc.txt
+# with Google-specific optimizations detailed at
+#   https://developers.google.com/search/reference/robots_txt
+
+
+class MultiPatternAutomaton:
+    """Deterministic automaton finding the longest of several robots.txt
+    patterns that matches a path.
+
+    Works like PatternAutomaton, on all the patterns at once: an NFA state is
+    a (pattern index, position) pair. A DFA state also records the length of
+    the longest pattern already matched. Positions in patterns that are not
+    longer than that are dropped, since they cannot change the result, and
+    the run ends as soon as no position is left.
+
+    The positions of all the patterns are numbered one after the other, and
+    a DFA state stores its set of positions as an int bitset: a few bits per
+    pattern character, rather than a tuple and a set entry per position.
+    """
+
+    # Upper bounds on the number of DFA states kept, and on the total size of
+    # their position bitsets, in bits. Past either, run() gives up and
+    # returns None so that the caller can match the patterns one by one.
+    # kMaxStates is higher than in PatternAutomaton since the states are
+    # shared by all the patterns. kMaxStateBits (1MB) bounds the memory kept
+    # when there are many long patterns.
+    kMaxStates = 1024
+    kMaxStateBits = 1 << 23
+
+    kNoMatch = -1
+
+    def __init__(self, patterns):
+        # Per position: the pattern it is in, and the pattern character at
+        # that position, or None past the end of the pattern.
+        self._owners = []
+        self._chars = []
+        # Per pattern: the position of its first character, whether it ends
+        # with '$', and its length, '$' included.
+        self._starts = []
+        self._anchored = []
+        self._lengths = []
+        for k, pattern in enumerate(patterns):
+            anchored = pattern.endswith("$")
+            text = pattern[:-1] if anchored else pattern
+            self._starts.append(len(self._chars))
+            self._anchored.append(anchored)
+            self._lengths.append(len(pattern))
+            self._owners.extend([k] * (len(text) + 1))
+            self._chars.extend(text)
+            self._chars.append(None)
+        self._exhausted = False
+        self._reset()
+
+    def _reset(self):
+        self._state_bits = 0
+        self._state_ids = {}
+        self._states = []
+        self._results = []
+        self._final = []
+        self._transitions = []
+        self._start_state = self._state_id(self._starts, self.kNoMatch)
+
+    @staticmethod
+    def _positions(bits):
+        # The positions set in a bitset, in increasing order.
+        digits = bin(bits)[:1:-1]
+        positions = []
+        b = digits.find("1")
+        while b != -1:
+            positions.append(b)
+            b = digits.find("1", b + 1)
+        return positions
+
+    def _state_id(self, positions, matched):
+        # Follows the epsilon transitions introduced by '*', and records the
+        # patterns matched once their last character is reached.
+        owners = self._owners
+        chars = self._chars
+        anchored = self._anchored
+        lengths = self._lengths
+
+        closure = set()
+        stack = list(positions)
+        while stack:
+            b = stack.pop()
+            if b in closure:
+                continue
+            closure.add(b)
+            c = chars[b]
+            if c == "*":
+                stack.append(b + 1)
+            elif c is None and not anchored[owners[b]] and lengths[owners[b]] > matched:
+                matched = lengths[owners[b]]
+
+        live = 0
+        result = matched
+        for b in closure:
+            k = owners[b]
+            if lengths[k] > matched and (chars[b] is not None or anchored[k]):
+                live |= 1 << b
+                # Result when the path ends in this state: anchored patterns
+                # only match if they end there too.
+                if chars[b] is None and lengths[k] > result:
+                    result = lengths[k]
+
+        key = (live, matched)
+        state = self._state_ids.get(key)
+        if state is None:
+            state = len(self._states)
+            self._state_bits += live.bit_length()
+            self._state_ids[key] = state
+            self._states.append(key)
+            self._results.append(result)
+            self._final.append(not live)
+            self._transitions.append({})
+        return state
+
+    def _add_transition(self, state, c):
+        chars = self._chars
+        live, matched = self._states[state]
+        positions = []
+        for b in self._positions(live):
+            char = chars[b]
+            if char == "*":
+                positions.append(b)
+            elif char == c:
+                positions.append(b + 1)
+        nxt = self._state_id(positions, matched)
+        self._transitions[state][c] = nxt
+        return nxt
+
+    def run(self, path: str):
+        """Returns the length of the longest pattern matching path, kNoMatch if
+        none does, and None if more DFA states than kMaxStates, or larger
+        ones than kMaxStateBits allows, are needed."""
+        if self._exhausted:
+            return None
+
+        transitions = self._transitions
+        final = self._final
+
+        state = self._start_state
+        if final[state]:
+            return self._results[state]
+
+        for c in path:
+            nxt = transitions[state].get(c)
+            if nxt is None:
+                nxt = self._add_transition(state, c)
+                if len(self._states) > self.kMaxStates or self._state_bits > self.kMaxStateBits:
+                    self._exhausted = True
+                    self._reset()
+                    return None
+            if final[nxt]:
+                return self._results[nxt]
+            state = nxt
+
+        return self._results[state]
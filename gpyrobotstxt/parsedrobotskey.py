@@ -22,6 +22,14 @@
 #
 # Converted 2023-11-17, from https://github.com/google/robotstxt/blob/master/robots.cc
 
+import sys
+
+
+def _as_bytes(key):
+    # Keys are matched as bytes; str keys are encoded to UTF-8 first.
+    return key.encode("utf-8") if isinstance(key, str) else key
+
+
 class ParsedRobotsKey:
     class KeyType:
         USER_AGENT = 1
@@ -30,19 +38,41 @@ class ParsedRobotsKey:
         DISALLOW = 4
         UNKNOWN = 128
 
+    # Known key prefixes, lowercase ASCII. These enable the parsing of common
+    # typos in robots.txt.
+    _USER_AGENT_KEYS = (b"user-agent", b"useragent", b"user agent")
+    _ALLOW_KEYS = (b"allow",)
+    _DISALLOW_KEYS = (
+        b"disallow",
+        b"dissallow",
+        b"dissalow",
+        b"disalow",
+        b"diaslow",
+        b"diasllow",
+        b"disallaw",
+    )
+    _SITEMAP_KEYS = (b"sitemap", b"site-map")
+    _kMaxKeyPrefixLen = max(
+        len(prefix)
+        for prefix in _USER_AGENT_KEYS + _ALLOW_KEYS + _DISALLOW_KEYS + _SITEMAP_KEYS
+    )
+
     def __init__(self):
         self._type = self.KeyType.UNKNOWN
-        self._key_text = ""
+        self._key_text = b""
 
     def parse(self, key):
+        key = _as_bytes(key)
         self._key_text = key
-        if self.key_is_user_agent(key):
+        # Only the beginning of the key matters, so lowercase that once.
+        key_lower = key[: self._kMaxKeyPrefixLen].lower()
+        if key_lower.startswith(self._USER_AGENT_KEYS):
             self._type = self.KeyType.USER_AGENT
-        elif self.key_is_allow(key):
+        elif key_lower.startswith(self._ALLOW_KEYS):
             self._type = self.KeyType.ALLOW
-        elif self.key_is_disallow(key):
+        elif key_lower.startswith(self._DISALLOW_KEYS):
             self._type = self.KeyType.DISALLOW
-        elif self.key_is_sitemap(key):
+        elif key_lower.startswith(self._SITEMAP_KEYS):
             self._type = self.KeyType.SITEMAP
         else:
             self._type = self.KeyType.UNKNOWN
@@ -51,29 +81,18 @@ class ParsedRobotsKey:
         return self._type
 
     def unknown_key(self):
-        return self._key_text
+        # Interned: the same few unknown keys (e.g. "crawl-delay", "host")
+        # come up again and again, in a file and across files.
+        return sys.intern(self._key_text.decode("utf-8", "replace"))
 
     def key_is_user_agent(self, key):
-        # Enables the parsing of common typos in robots.txt
-        return key.lower().startswith("user-agent") or \
-            key.lower().startswith("useragent") or \
-            key.lower().startswith("user agent")
+        return _as_bytes(key).lower().startswith(self._USER_AGENT_KEYS)
 
     def key_is_allow(self, key):
-        return key.lower().startswith("allow")
+        return _as_bytes(key).lower().startswith(self._ALLOW_KEYS)
 
     def key_is_disallow(self, key):
-        # Enables the parsing of common typos in robots.txt
-        return key.lower().startswith("disallow") or \
-            key.lower().startswith("dissallow") or \
-            key.lower().startswith("dissalow") or \
-            key.lower().startswith("disalow") or \
-            key.lower().startswith("diaslow") or \
-            key.lower().startswith("diasllow") or \
-            key.lower().startswith("disallaw")
+        return _as_bytes(key).lower().startswith(self._DISALLOW_KEYS)
 
     def key_is_sitemap(self, key):
-        # Enables the parsing of common typos in robots.txt
-        return key.lower().startswith("sitemap") or \
-            key.lower().startswith("site-map")
-
+        return _as_bytes(key).lower().startswith(self._SITEMAP_KEYS)
@@ -0,0 +1,133 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#
+# Implements expired internet draft
+#  http://www.robotstxt.org/norobots-rfc.txt
+# with Google-specific optimizations detailed at
+#   https://developers.google.com/search/reference/robots_txt
+
+
+class PatternAutomaton:
+    """Deterministic automaton for a single robots.txt pattern.
+
+    The pattern is seen as an NFA whose states are the positions in the
+    pattern: position i means that pattern[:i] has been matched. A '*' at
+    position i loops on any character and has an epsilon transition to i + 1.
+    A '$' at the very end of the pattern only accepts at the end of the path.
+
+    DFA states (sets of NFA positions) are built lazily, one transition at a
+    time, and memoized, so checking many paths against the same pattern costs
+    one dict lookup per path character once the reachable states are known.
+    """
+
+    # Upper bound on the number of DFA states kept for one pattern. Past that,
+    # run() gives up and returns None so that the caller can fall back to the
+    # NFA simulation.
+    kMaxStates = 256
+
+    # DFA state ids reserved for the dead state (no NFA position left) and,
+    # for patterns without a trailing '$', the state reached once the whole
+    # pattern has matched. Both end the run, so they share one comparison in
+    # the inner loop.
+    kDeadState = 0
+    kMatchedState = 1
+    kFirstLiveState = 2
+
+    def __init__(self, pattern: str):
+        self._anchored = pattern.endswith("$")
+        self._pattern = pattern[:-1] if self._anchored else pattern
+        self._exhausted = False
+        self._reset()
+
+    def _reset(self):
+        self._state_ids = {}
+        self._states = []
+        self._accepting = []
+        self._transitions = []
+        self._state_id(frozenset())
+        self._states.append(None)
+        self._accepting.append(True)
+        self._transitions.append({})
+        self._start_state = self._state_id(self._closure([0]))
+
+    def _closure(self, positions):
+        # Follows the epsilon transitions introduced by '*'.
+        pattern = self._pattern
+        end = len(pattern)
+        closure = set()
+        stack = list(positions)
+        while stack:
+            i = stack.pop()
+            if i in closure:
+                continue
+            closure.add(i)
+            if i < end and pattern[i] == "*":
+                stack.append(i + 1)
+        return frozenset(closure)
+
+    def _state_id(self, positions):
+        end = len(self._pattern)
+        if not self._anchored and end in positions:
+            return self.kMatchedState
+        state = self._state_ids.get(positions)
+        if state is None:
+            state = len(self._states)
+            self._state_ids[positions] = state
+            self._states.append(positions)
+            self._accepting.append(end in positions)
+            self._transitions.append({})
+        return state
+
+    def _add_transition(self, state, c):
+        pattern = self._pattern
+        end = len(pattern)
+        positions = []
+        for i in self._states[state]:
+            if i < end:
+                if pattern[i] == "*":
+                    positions.append(i)
+                elif pattern[i] == c:
+                    positions.append(i + 1)
+        nxt = self._state_id(self._closure(positions))
+        self._transitions[state][c] = nxt
+        return nxt
+
+    def run(self, path: str):
+        """Returns True if path matches the pattern, False if it does not, and
+        None if the pattern needs more DFA states than kMaxStates allows."""
+        if self._exhausted:
+            return None
+
+        transitions = self._transitions
+        first_live_state = self.kFirstLiveState
+
+        state = self._start_state
+        if state < first_live_state:
+            return state == self.kMatchedState
+
+        for c in path:
+            nxt = transitions[state].get(c)
+            if nxt is None:
+                nxt = self._add_transition(state, c)
+                if len(self._states) > self.kMaxStates:
+                    self._exhausted = True
+                    self._reset()
+                    return None
+            if nxt < first_live_state:
+                return nxt == self.kMatchedState
+            state = nxt
+
+        return self._accepting[state]
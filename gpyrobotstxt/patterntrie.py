@@ -0,0 +1,72 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#
+# Implements expired internet draft
+#  http://www.robotstxt.org/norobots-rfc.txt
+# with Google-specific optimizations detailed at
+#   https://developers.google.com/search/reference/robots_txt
+
+
+class PatternTrie:
+    """Trie of the robots.txt patterns without wildcards.
+
+    Prefix patterns match paths starting with them, exact patterns (with a
+    trailing '$') only match the path they spell. longest_match() walks the
+    path down the trie once, however many patterns there are, and stops at
+    the first character no pattern continues with.
+    """
+
+    # Keys of the values stored in a node, next to its children, which are
+    # keyed by single characters: the priority of the prefix pattern, and of
+    # the exact pattern, ending at the node.
+    kPrefixKey = None
+    kExactKey = ""
+
+    kNoMatch = -1
+
+    def __init__(self):
+        self._root = {}
+
+    def _insert(self, text, key, priority):
+        node = self._root
+        for c in text:
+            node = node.setdefault(c, {})
+        if node.get(key, self.kNoMatch) < priority:
+            node[key] = priority
+
+    def insert_prefix(self, prefix, priority):
+        self._insert(prefix, self.kPrefixKey, priority)
+
+    def insert_exact(self, path, priority):
+        self._insert(path, self.kExactKey, priority)
+
+    def longest_match(self, path):
+        """Returns the highest priority of the patterns matching path, or
+        kNoMatch if none does."""
+        prefix_key = self.kPrefixKey
+        node = self._root
+        priority = node.get(prefix_key, self.kNoMatch)
+        for c in path:
+            node = node.get(c)
+            if node is None:
+                return priority
+            matched = node.get(prefix_key)
+            if matched is not None and matched > priority:
+                priority = matched
+        matched = node.get(self.kExactKey)
+        if matched is not None and matched > priority:
+            priority = matched
+        return priority
@@ -22,60 +22,115 @@
 #
 # Converted 2023-11-17, from https://github.com/google/robotstxt/blob/master/robots.cc
 
-from urllib.parse import urlparse
+import functools
+import re
 from typing import List
 
+from gpyrobotstxt.multipatternautomaton import MultiPatternAutomaton
+from gpyrobotstxt.patterntrie import PatternTrie
 from gpyrobotstxt.robotsmatchstrategy import RobotsMatchStrategy
 from gpyrobotstxt.robotstxtparser import RobotsTxtParser
 from gpyrobotstxt.match import MatchHierarchy
 
 
+# Matchable prefix of a user-agent, see RobotsMatcher.extract_user_agent and
+# RobotsMatcher.extract_user_agent_rfc7231.
+_USER_AGENT = re.compile(r"[a-zA-Z_-]*")
+_USER_AGENT_RFC7231 = re.compile(r"[a-zA-Z0-9~#$%'*+.^_`|-]*")
+
+# Path, params and query part of a URL, for get_path_params_query(): after the
+# optional leading '//', the scheme (only when '://' comes before any of '/?;')
+# and the authority, everything from the first of '/?;' up to the fragment.
+# A '#' before that leaves no path.
+_URL_PATH = re.compile(r"(?://)?(?:[^/?;#]*://)?[^/?;#]*([/?;][^#]*)?")
+_URL_PATH_BYTES = re.compile(rb"(?://)?(?:[^/?;#]*://)?[^/?;#]*([/?;][^#]*)?")
+
+
+@functools.lru_cache(maxsize=32)
+def _any_of(characters):
+    return re.compile("[" + re.escape(characters) + "]")
+
+
 def find_first_of(s, characters, pos=0):
-    st = set(characters)
-    ind = next((i for i, ch in enumerate(s[pos:]) if ch in st), None)
-    if ind is not None:
-        return pos + ind
+    # Returns the index of the first of characters in s, from pos on, or -1.
+    # No longer used by get_path_params_query(), but kept as public API.
+    if not characters:
+        return -1
+    m = _any_of(characters).search(s, pos)
+    if m is not None:
+        return m.start()
     return -1
 
 
-def get_path_params_query(url: str):
+def get_path_params_query(url):
     # Extracts path (with params) and query part from URL. Removes scheme,
     # authority, and fragment. Result always starts with "/".
     # Returns "/" if the url doesn't have a path or is not valid.
+    # Works on str as well as on bytes URLs, bytes-like URLs give a bytes path.
+    if isinstance(url, str):
+        if url[:1] == "/" and url[1:2] != "/":
+            # Already a path: only the fragment needs to go.
+            hash_pos = url.find("#")
+            return url if hash_pos == -1 else url[:hash_pos]
+        path = _URL_PATH.match(url).group(1)
+        slash = "/"
+    else:
+        if url[:1] == b"/" and url[1:2] != b"/":
+            hash_pos = url.find(b"#")
+            return bytes(url if hash_pos == -1 else url[:hash_pos])
+        path = _URL_PATH_BYTES.match(url).group(1)
+        slash = b"/"
 
-    path = ""
+    if not path:
+        return slash
+    if not path.startswith(slash):
+        # Prepend a slash if the result would start e.g. with '?'.
+        return slash + path
+    return path
 
-    # Initial two slashes are ignored.
-    search_start = 0
-    if len(url) >= 2 and url[0] == "/" and url[1] == "/":
-        search_start = 2
 
-    early_path = find_first_of(url, "/?;", search_start)
-    protocol_end = url.find("://", search_start)
-    if early_path < protocol_end:
-        # If path, param or query starts before ://, :// doesn't indicate protocol.
-        protocol_end = -1
+@functools.lru_cache(maxsize=128)
+def _parse_rules(robots_body: bytes, extract_user_agent):
+    # Memoized, so that checking many URLs against the same robots.txt body
+    # parses it only once. The result doesn't depend on the queried
+    # user-agents nor on the match strategy, so it is shared by all matchers.
+    collector = RobotsGroupCollector(extract_user_agent)
+    parser = RobotsTxtParser(robots_body, collector)
+    parser.parse()
+
+    return RobotsRules(collector.groups)
 
-    if protocol_end == -1:
-        protocol_end = search_start
-    else:
-        protocol_end += 3
 
-    path_start = find_first_of(url, "/?;", protocol_end)
-    if path_start != -1:
-        hash_pos = url.find("#", search_start)
-        if hash_pos != -1 and hash_pos < path_start:
-            return "/"
-        path_end = len(url) if hash_pos == -1 else hash_pos
-        if url[path_start] != "/":
-            # Prepend a slash if the result would start e.g. with '?'.
-            return "/" + url[path_start:path_end]
-        return url[path_start:path_end]
+def clear_compile_cache():
+    # Drops the parse results kept by RobotsMatcher.compile(), e.g. to free
+    # their memory once a batch of robots.txt files is done.
+    _parse_rules.cache_clear()
 
-    return "/"
+
+def is_global_user_agent(user_agent: str):
+    # Google-specific optimization: a '*' followed by space and more characters
+    # in a user-agent record is still regarded a global rule.
+    return (
+        len(user_agent) >= 1
+        and user_agent[0] == "*"
+        and (len(user_agent) == 1 or user_agent[1].isspace())
+    )
 
 
 class RobotsMatcher:
+    __slots__ = (
+        "_seen_global_agent",
+        "_seen_specific_agent",
+        "_ever_seen_specific_agent",
+        "_seen_separator",
+        "_path",
+        "_user_agents",
+        "_user_agents_cf",
+        "_allow",
+        "_disallow",
+        "_match_strategy",
+    )
+
     def __init__(self):
         self._seen_global_agent = False
         self._seen_specific_agent = False
@@ -83,6 +138,7 @@ class RobotsMatcher:
         self._seen_separator = False
         self._path = None
         self._user_agents = None
+        self._user_agents_cf = frozenset()
 
         self._allow = MatchHierarchy()
         self._disallow = MatchHierarchy()
@@ -93,22 +149,18 @@ class RobotsMatcher:
             raise ValueError("Path must begin with '/'")
         self._path = path
         self._user_agents = user_agents
+        # User-agents are matched case-insensitively, so casefold them once.
+        self._user_agents_cf = frozenset(agent.casefold() for agent in user_agents)
 
-    def extract_user_agent(self, user_agent: str):
+    @staticmethod
+    def extract_user_agent(user_agent: str):
         # Allowed characters in user-agent are [a-zA-Z_-].
-        def ascii_is_alpha(c):
-            return "a" <= c <= "z" or "A" <= c <= "Z"
-
-        i = 0
-        while i < len(user_agent):
-            c = user_agent[i]
-            if not ascii_is_alpha(c) and not c == "-" and not c == "_":
-                break
-            i += 1
+        # Subclasses overriding it must keep it a staticmethod: compile()
+        # caches parse results by type(self).extract_user_agent.
+        return _USER_AGENT.match(user_agent).group()
 
-        return user_agent[:i]
-
-    def extract_user_agent_rfc7231(self, user_agent: str):
+    @staticmethod
+    def extract_user_agent_rfc7231(user_agent: str):
         # extract_user_agent extracts the matchable part of a user agent string,
         # essentially stopping at the first invalid character.
         # Example: 'Googlebot/2.1' becomes 'Googlebot'
@@ -125,29 +177,7 @@ class RobotsMatcher:
         #  / DIGIT / ALPHA
         #
         # See https://httpwg.org/specs/rfc7231.html#header.user-agent
-
-        def ascii_is_alpha(c):
-            return "a" <= c <= "z" or "A" <= c <= "Z"
-
-        def ascii_is_numeric(c):
-            return "0" <= c <= "9"
-
-        def ascii_is_special(c):
-            allowed = "~#$%'*+-.^_`|~"
-            return c in allowed
-
-        i = 0
-        while i < len(user_agent):
-            c = user_agent[i]
-            if (
-                not ascii_is_alpha(c)
-                and not ascii_is_numeric(c)
-                and not ascii_is_special(c)
-            ):
-                break
-            i += 1
-
-        return user_agent[:i]
+        return _USER_AGENT_RFC7231.match(user_agent).group()
 
     def seen_any_agent(self):
         return self._seen_global_agent or self._seen_specific_agent
@@ -176,21 +206,13 @@ class RobotsMatcher:
             self._seen_specific_agent = False
             self._seen_separator = False
 
-        # Google-specific optimization: a '*' followed by space and more characters
-        # in a user-agent record is still regarded a global rule.
-        if (
-            len(user_agent) >= 1
-            and user_agent[0] == "*"
-            and (len(user_agent) == 1 or user_agent[1].isspace())
-        ):
+        if is_global_user_agent(user_agent):
             self._seen_global_agent = True
         else:
             user_agent = self.extract_user_agent(user_agent)
-            for agent in self._user_agents:
-                if agent.casefold() == user_agent.casefold():
-                    self._ever_seen_specific_agent = True
-                    self._seen_specific_agent = True
-                    break
+            if user_agent.casefold() in self._user_agents_cf:
+                self._ever_seen_specific_agent = True
+                self._seen_specific_agent = True
 
     def handle_allow(self, line_num, value):
         # handle_allow is called for every "Allow:" line in robots.txt.
@@ -203,13 +225,13 @@ class RobotsMatcher:
         priority = self._match_strategy.match_allow(self._path, value)
         if priority >= 0:
             if self._seen_specific_agent:
-                if self._allow._specific.priority < priority:
-                    self._allow._specific.set(priority, line_num)
+                match = self._allow._specific
             else:
                 if not self._seen_global_agent:
                     raise SyntaxError("Not seen global agent")
-                if self._allow._global.priority < priority:
-                    self._allow._global.set(priority, line_num)
+                match = self._allow._global
+            if match.priority < priority:
+                match.set(priority, line_num)
         else:
             #  Google-specific optimization: 'index.htm' and 'index.html' are normalized to '/'
             slash_pos = value.rfind("/")
@@ -227,13 +249,13 @@ class RobotsMatcher:
         priority = self._match_strategy.match_disallow(self._path, value)
         if priority >= 0:
             if self._seen_specific_agent:
-                if self._disallow._specific.priority < priority:
-                    self._disallow._specific.set(priority, line_num)
+                match = self._disallow._specific
             else:
                 if not self._seen_global_agent:
                     raise SyntaxError("Not seen global agent")
-                if self._disallow._global.priority < priority:
-                    self._disallow._global.set(priority, line_num)
+                match = self._disallow._global
+            if match.priority < priority:
+                match.set(priority, line_num)
 
     def handle_sitemap(self, line_num, value):
         # handle_sitemap is called for every "Sitemap:" line in robots.txt.
@@ -249,36 +271,296 @@ class RobotsMatcher:
 
     def disallow(self):
         # Ref: https://github.com/google/robotstxt/blob/master/robots.cc#L506
-        if self._allow._specific.priority > 0 or self._disallow._specific.priority > 0:
-            return self._disallow._specific.priority > self._allow._specific.priority
+        allow = self._allow._specific.priority
+        disallow = self._disallow._specific.priority
+        if allow > 0 or disallow > 0:
+            return disallow > allow
 
         if self._ever_seen_specific_agent:
             return False
 
-        if self._allow._global.priority > 0 or self._disallow._global.priority > 0:
-            return self._disallow._global.priority > self._allow._global.priority
+        allow = self._allow._global.priority
+        disallow = self._disallow._global.priority
+        if allow > 0 or disallow > 0:
+            return disallow > allow
 
         return False
 
     def allowed_by_robots(self, robots_body, user_agents, url):
         # Ref: https://github.com/google/robotstxt/blob/master/robots.cc#L487
-        try:
-            urlparse(url)
-        except:
-            return False
+        return self.compile(robots_body).allowed_by_robots(user_agents, url)
+
+    def one_agent_allowed_by_robots(self, robots_txt, user_agent, url):
+        return self.allowed_by_robots(robots_txt, [user_agent], url)
 
+    def compile(self, robots_body):
+        # Parses robots_body once into a CompiledRobots, which answers the same
+        # questions as allowed_by_robots() for any number of URLs and user-agents.
+        # Parse results are cached by robots_body, see _parse_rules() and
+        # clear_compile_cache(). The cache is keyed by bytes, so str bodies are
+        # encoded, and other bytes-like ones (bytearray, memoryview) copied.
+        # The result shares this matcher's match strategy: like the matcher,
+        # it must not be used from several threads at once.
+        # Matching no longer goes through the handle_*() callbacks and
+        # disallow() of the matcher, so allowed_by_robots() ignores subclass
+        # overrides of those: they are only used by RobotsTxtParser(...).parse().
         if isinstance(robots_body, str):
             robots_body = robots_body.encode("utf-8")
+        else:
+            robots_body = bytes(robots_body)
 
-        path: str = get_path_params_query(url)
-        self.init_user_agents_and_path(user_agents, path)
-        parser = RobotsTxtParser(robots_body, self)
-        parser.parse()
-
-        return not self.disallow()
+        # Keyed on the class attribute: a bound method would be a new key
+        # on every call, and would keep the matcher alive in the cache.
+        rules = _parse_rules(robots_body, type(self).extract_user_agent)
+        return CompiledRobots(rules, self._match_strategy)
 
-    def one_agent_allowed_by_robots(self, robots_txt, user_agent, url):
-        return self.allowed_by_robots(robots_txt, [user_agent], url)
+    def prepare(self, robots_body, user_agents):
+        # Parses robots_body and picks the rules for user_agents once, into an
+        # AgentRules that only has the per-URL matching left to do. Not
+        # thread-safe either, see compile().
+        return self.compile(robots_body).rules_for(user_agents)
 
     def is_valid_user_agent_to_obey(self, user_agent):
         return len(user_agent) > 0 and self.extract_user_agent(user_agent) == user_agent
+
+
+class RobotsGroup:
+    # A group of records in robots.txt: the user-agent lines starting it, and
+    # the allow and disallow patterns following them.
+    def __init__(self):
+        self.user_agents = set()  # Casefolded, as extracted by extract_user_agent.
+        self.is_global = False
+        self.allow = []
+        self.disallow = []
+
+    def has_rules(self):
+        return len(self.allow) > 0 or len(self.disallow) > 0
+
+
+class RobotsGroupCollector:
+    # Parse handler splitting robots.txt into RobotsGroup objects, for
+    # RobotsMatcher.compile(). Group boundaries follow RobotsMatcher: a
+    # user-agent line following a rule starts a new group, and rules outside
+    # of any group are ignored.
+    def __init__(self, extract_user_agent):
+        self._extract_user_agent = extract_user_agent
+        self.groups = []
+        self._group = None
+
+    def handle_robots_start(self):
+        self.groups = []
+        self._group = None
+
+    def handle_robots_end(self):
+        # Longest patterns first, so that the first match is the longest match.
+        for group in self.groups:
+            group.allow.sort(key=len, reverse=True)
+            group.disallow.sort(key=len, reverse=True)
+
+    def handle_user_agent(self, line_num, user_agent):
+        if self._group is None or self._group.has_rules():
+            self._group = RobotsGroup()
+            self.groups.append(self._group)
+
+        if is_global_user_agent(user_agent):
+            self._group.is_global = True
+        else:
+            self._group.user_agents.add(self._extract_user_agent(user_agent).casefold())
+
+    def handle_allow(self, line_num, value):
+        if self._group is None:
+            return
+
+        self._group.allow.append(value)
+        # Google-specific optimization: 'index.htm' and 'index.html' are normalized to '/'.
+        # RobotsMatcher only tries the normalized pattern when value doesn't match,
+        # but the normalized pattern is always shorter, so it can't win over value.
+        slash_pos = value.rfind("/")
+        if slash_pos != -1 and value[slash_pos:].startswith("/index.htm"):
+            self._group.allow.append(value[: slash_pos + 1] + "$")
+
+    def handle_disallow(self, line_num, value):
+        if self._group is None:
+            return
+
+        self._group.disallow.append(value)
+
+    def handle_sitemap(self, line_num, value):
+        pass
+
+    def handle_unknown_action(self, line_num, action, value):
+        pass
+
+
+class RobotsRules:
+    # The parse output of a robots.txt body: its groups, in file order. Shared
+    # between callers through the _parse_rules() cache, so never modified once
+    # built, except for the memo of patterns_for().
+
+    # The patterns_for() memo is dropped when it grows past this many lists
+    # of user-agents.
+    kMaxCachedUserAgents = 64
+
+    def __init__(self, groups):
+        self.groups = tuple(groups)
+
+        # Index of the groups by user-agent, so that queries only look at the
+        # groups that apply to them.
+        self.groups_by_agent = {}
+        for group in self.groups:
+            for user_agent in group.user_agents:
+                self.groups_by_agent.setdefault(user_agent, []).append(group)
+        self.global_groups = [group for group in self.groups if group.is_global]
+
+        self._patterns_by_agents = {}
+
+    def groups_for(self, user_agents):
+        # Rules of the groups for the queried user-agents win over the global
+        # ones, even if none of them matches. user_agents are casefolded.
+        groups = {}
+        for user_agent in user_agents:
+            # A group naming several of the user-agents is only checked once.
+            groups.update(dict.fromkeys(self.groups_by_agent.get(user_agent, ())))
+        if not groups:
+            return self.global_groups
+        return list(groups)
+
+    def patterns_for(self, user_agents):
+        # Returns the allow and the disallow patterns applying to user_agents,
+        # each merged across groups and sorted longest first, so that the first
+        # match is the longest match. Memoized per list of user-agents.
+        key = tuple(user_agent.casefold() for user_agent in user_agents)
+        patterns = self._patterns_by_agents.get(key)
+        if patterns is None:
+            groups = self.groups_for(key)
+            allow = sorted((pattern for group in groups for pattern in group.allow), key=len, reverse=True)
+            disallow = sorted((pattern for group in groups for pattern in group.disallow), key=len, reverse=True)
+            patterns = tuple(allow), tuple(disallow)
+            if len(self._patterns_by_agents) >= self.kMaxCachedUserAgents:
+                self._patterns_by_agents.clear()
+            self._patterns_by_agents[key] = patterns
+        return patterns
+
+
+class CompiledRobots:
+    """A robots.txt file parsed once, to be checked against many URLs.
+
+    Returned by RobotsMatcher.compile(). allowed_by_robots() gives the same
+    answer as RobotsMatcher.allowed_by_robots() on the same robots.txt body,
+    using the longest-match rule for priorities.
+
+    Not thread-safe: it matches with the RobotsMatchStrategy of the matcher
+    that compiled it, whose pattern cache and scratch buffer are shared
+    without locking. Use one RobotsMatcher per thread.
+    """
+
+    def __init__(self, rules, match_strategy):
+        self._rules = rules
+        self._match_strategy = match_strategy
+
+    def _longest_match(self, path, patterns):
+        # Returns the length of the longest of patterns matching path, or -1 if
+        # none does. Patterns are sorted longest first.
+        matches = self._match_strategy.matches
+        for pattern in patterns:
+            if matches(path, pattern):
+                return len(pattern)
+        return -1
+
+    def allowed_by_robots(self, user_agents, url):
+        path = get_path_params_query(url)
+        allow_patterns, disallow_patterns = self._rules.patterns_for(user_agents)
+        allow = self._longest_match(path, allow_patterns)
+        disallow = self._longest_match(path, disallow_patterns)
+        if allow > 0 or disallow > 0:
+            return disallow <= allow
+        return True
+
+    def one_agent_allowed_by_robots(self, user_agent, url):
+        return self.allowed_by_robots([user_agent], url)
+
+    def rules_for(self, user_agents):
+        allow, disallow = self._rules.patterns_for(user_agents)
+        return AgentRules(allow, disallow, self._match_strategy)
+
+    def filter_allowed(self, user_agents, urls):
+        # Returns the URLs of urls that user_agents may fetch, in order. The
+        # rules for user_agents are picked once for the whole batch.
+        return self.rules_for(user_agents).filter_allowed(urls)
+
+
+class AgentRules:
+    """The rules of a robots.txt that apply to a given list of user-agents.
+
+    Returned by RobotsMatcher.prepare() and CompiledRobots.rules_for(). The
+    patterns of all the groups for the user-agents are matched in one pass
+    per kind: prefix and exact patterns with a PatternTrie, patterns with
+    wildcards with a MultiPatternAutomaton. The remaining suffix patterns
+    are checked longest first.
+
+    Not thread-safe, like CompiledRobots: the automata are built lazily, as
+    paths are matched, and the match strategy is the matcher's.
+    """
+
+    def __init__(self, allow, disallow, match_strategy):
+        self._match_strategy = match_strategy
+        self._allow = self._split(allow)
+        self._disallow = self._split(disallow)
+
+    def _split(self, patterns):
+        # Returns the trie of the prefix and exact patterns, the suffix
+        # patterns, the general ones (see RobotsMatchStrategy), and the
+        # automaton matching the latter, if any. patterns are sorted longest
+        # first, as returned by RobotsRules.patterns_for().
+        trie = PatternTrie()
+        suffix = []
+        general = []
+        for pattern in patterns:
+            shape, text = self._match_strategy.classify(pattern)
+            if shape == RobotsMatchStrategy.kPrefixPattern:
+                trie.insert_prefix(text, len(pattern))
+            elif shape == RobotsMatchStrategy.kExactPattern:
+                trie.insert_exact(text, len(pattern))
+            elif shape == RobotsMatchStrategy.kSuffixPattern:
+                suffix.append(pattern)
+            else:
+                general.append(pattern)
+        automaton = MultiPatternAutomaton(general) if general else None
+        return trie, suffix, general, automaton
+
+    def _longest_match(self, path, rules):
+        # Returns the length of the longest of the patterns matching path, or
+        # -1 if none does.
+        trie, suffix, general, automaton = rules
+        matches = self._match_strategy.matches
+        priority = trie.longest_match(path)
+        if automaton is not None:
+            matched = automaton.run(path)
+            if matched is None:
+                for pattern in general:
+                    if len(pattern) <= priority:
+                        break
+                    if matches(path, pattern):
+                        priority = len(pattern)
+                        break
+            elif matched > priority:
+                priority = matched
+        for pattern in suffix:
+            if len(pattern) <= priority:
+                break
+            if matches(path, pattern):
+                return len(pattern)
+        return priority
+
+    def allowed(self, url):
+        path = get_path_params_query(url)
+        allow = self._longest_match(path, self._allow)
+        disallow = self._longest_match(path, self._disallow)
+        if allow > 0 or disallow > 0:
+            return disallow <= allow
+        return True
+
+    def filter_allowed(self, urls):
+        # Returns the URLs of urls that may be fetched, in order.
+        allowed = self.allowed
+        return [url for url in urls if allowed(url)]
@@ -22,9 +22,26 @@
 #
 # Converted 2023-11-17, from https://github.com/google/robotstxt/blob/master/robots.cc
 
+from gpyrobotstxt.patternautomaton import PatternAutomaton
+
+
 class RobotsMatchStrategy:
+    # Shapes of patterns. All but kGeneralPattern are matched with a single
+    # str method call.
+    kPrefixPattern = 1  # No '*' other than trailing ones, no trailing '$'.
+    kExactPattern = 2  # No '*', trailing '$'.
+    kSuffixPattern = 3  # Leading '*', trailing '$', no other '*'.
+    kGeneralPattern = 4  # Anything else, matched with a PatternAutomaton.
+
+    # Patterns are classified (and compiled into a PatternAutomaton when
+    # needed) once, and reused for every path checked against them. The cache
+    # is dropped when it grows past this many patterns.
+    kMaxCachedPatterns = 1024
+
     def __init__(self):
-        pass
+        self._compiled = {}
+        # Scratch pos[] array of match_nfa(), grown to the longest path seen.
+        self._pos = [0]
 
     def match_allow(self, path, pattern):
         # Ref: https://github.com/google/robotstxt/blob/master/robots.cc#L640
@@ -38,7 +55,62 @@ class RobotsMatchStrategy:
             return len(pattern)
         return -1
 
+    def classify(self, pattern):
+        # Returns the shape of the pattern, and the text to match the path
+        # with: the pattern itself for general patterns. Builds nothing.
+        # A '$' is special only at the end of the pattern.
+        if pattern.endswith("*"):
+            prefix = pattern.rstrip("*")
+            if "*" not in prefix:
+                return self.kPrefixPattern, prefix
+        elif "*" not in pattern:
+            if pattern.endswith("$"):
+                return self.kExactPattern, pattern[:-1]
+            return self.kPrefixPattern, pattern
+        elif (
+            pattern.startswith("*")
+            and pattern.endswith("$")
+            and "*" not in pattern[1:-1]
+        ):
+            return self.kSuffixPattern, pattern[1:-1]
+        return self.kGeneralPattern, pattern
+
+    def compile(self, pattern):
+        # Returns the shape of the pattern, and what to match the path with:
+        # a PatternAutomaton for general patterns.
+        shape, text = self.classify(pattern)
+        if shape == self.kGeneralPattern:
+            return shape, PatternAutomaton(pattern)
+        return shape, text
+
     def matches(self, path, pattern):
+        """Returns true if URI path matches the specified pattern.
+
+        Plain patterns are matched with str.startswith(), str.endswith() or
+        string equality, other patterns with their cached PatternAutomaton.
+        The latter fall back to match_nfa() when the automaton grows too
+        large.
+        """
+        compiled = self._compiled.get(pattern)
+        if compiled is None:
+            if len(self._compiled) >= self.kMaxCachedPatterns:
+                self._compiled.clear()
+            compiled = self._compiled[pattern] = self.compile(pattern)
+
+        shape, compiled_pattern = compiled
+        if shape == self.kPrefixPattern:
+            return path.startswith(compiled_pattern)
+        if shape == self.kExactPattern:
+            return path == compiled_pattern
+        if shape == self.kSuffixPattern:
+            return path.endswith(compiled_pattern)
+
+        matched = compiled_pattern.run(path)
+        if matched is None:
+            return self.match_nfa(path, pattern)
+        return matched
+
+    def match_nfa(self, path, pattern):
         # Ref: https://github.com/google/robotstxt/blob/master/robots.cc#L74
         """Implements robots.txt pattern matching.
 
@@ -52,23 +124,42 @@ class RobotsMatchStrategy:
         pathlen = len(path)
         numpos = 1
 
-        ###numpos = 0
-
         # The pos[] array holds a sorted list of indexes of 'path', with length
         # 'numpos'.  At the start and end of each iteration of the main loop below,
         # the pos[] array will hold a list of the prefixes of the 'path' which can
         # match the current prefix of 'pattern'. If this list is ever empty,
         # return false. If we reach the end of 'pattern' with at least one element
         # in pos[], return true.
-        pos = [0] * (pathlen + 1)
+        # Only the first 'numpos' entries are live, so the array is reused
+        # across calls without being cleared.
+        # Right after a '*', every index from 'start' to 'pathlen' is live: pos[]
+        # is then left unfilled, and 'start' is not None.
+        if len(self._pos) <= pathlen:
+            self._pos.extend([0] * (pathlen + 1 - len(self._pos)))
+        pos = self._pos
+        pos[0] = 0
+        start = None
 
         for i in range(len(pattern)):
             if pattern[i] == "$" and (i + 1 == len(pattern)):
+                if start is not None:
+                    return True
                 return pos[numpos - 1] == pathlen
             if pattern[i] == "*":
-                numpos = pathlen - pos[0] + 1
-                for j in range(1, numpos):
-                    pos[j] = pos[j - 1] + 1
+                if start is None:
+                    start = pos[0]
+            elif start is not None:
+                # Includes '$' when not at the end of the pattern.
+                newnumpos = 0
+                j = path.find(pattern[i], start)
+                while j != -1:
+                    pos[newnumpos] = j + 1
+                    newnumpos += 1
+                    j = path.find(pattern[i], j + 1)
+                numpos = newnumpos
+                start = None
+                if numpos == 0:
+                    return False
             else:
                 # Includes '$' when not at the end of the pattern.
                 newnumpos = 0
@@ -23,27 +23,70 @@
 # Converted 2023-11-17, from https://github.com/google/robotstxt/blob/master/robots.cc
 
 import re
-import io
 
 from gpyrobotstxt.parsedrobotskey import ParsedRobotsKey
 
 
-def ishexdigit(c):
-    return "0" <= c <= "9" or "a" <= c <= "f" or "A" <= c <= "F"
+# Replacement for every octet of a pattern: octets with the highest bit set are
+# %-escaped, the others are kept as is.
+_ESCAPE_TABLE = [b"%%%02X" % i if i >= 0x80 else bytes([i]) for i in range(256)]
+_ESCAPE_SEQUENCE = re.compile(rb"%[0-9a-fA-F]{2}")
+_LOWERCASE_ESCAPE = re.compile(rb"%(?:[a-f][0-9a-fA-F]|[0-9A-F][a-f])")
+# The UTF-8 BOM, then its partial forms, longest first.
+_UTF_BOMS = (b"\xef\xbb\xbf", b"\xef\xbb", b"\xef")
+
+
+def _upper_escape_sequence(m):
+    return m.group(0).upper()
+
+
+def maybe_escape_pattern(path):
+    # Works on bytes; str patterns are encoded to UTF-8 first, and the
+    # result is returned with the same type as path.
+    if isinstance(path, str):
+        # Plain ASCII without escape sequences needs no changes.
+        if path.isascii() and "%" not in path:
+            return path
+        return maybe_escape_pattern(path.encode("utf-8")).decode("utf-8")
+
+    need_capitalize = b"%" in path and _LOWERCASE_ESCAPE.search(path) is not None
+
+    # Return if no changes needed. Most don't.
+    if path.isascii() and not need_capitalize:
+        return path
+
+    if need_capitalize:
+        # (a) Normalize %-escaped sequences (eg. %2f -> %2F).
+        path = _ESCAPE_SEQUENCE.sub(_upper_escape_sequence, path)
+    if not path.isascii():
+        # (b) %-escape octets whose highest bit is set. These are outside the ASCII range.
+        path = b"".join([_ESCAPE_TABLE[b] for b in path])
+    # (c) Normal characters are left untouched.
+
+    return path
 
 
 class RobotsTxtParser:
     def __init__(self, robots_body, handler):
         self._robots_body = robots_body
         self._handler = handler
+        # Handlers may take all the known directives through one
+        # handle_directive(line_num, key_type, value) method instead of the
+        # per-kind methods. Looked up once, rather than for every line.
+        self._handle_directive = getattr(handler, "handle_directive", None)
 
-    def get_key_and_value_from(self, line: str):
+    def get_key_and_value_from(self, line):
         # get_key_and_value_from attempts to parse a line of robots.txt into a key/value pair.
         # On success, the parsed key and value, and true, are returned.
         # If parsing is unsuccessful, parseKeyAndValue returns two empty strings and false.
+        # Lines are parsed as bytes: keys and separators are all ASCII. A str
+        # line is encoded to UTF-8, and its key and value are returned as str.
+        if isinstance(line, str):
+            key, value, ok = self.get_key_and_value_from(line.encode("utf-8"))
+            return key.decode("utf-8"), value.decode("utf-8"), ok
 
         # Remove comments from the current robots.txt line
-        comment = line.find("#")
+        comment = line.find(b"#")
         if comment != -1:
             line = line[:comment]
 
@@ -51,29 +94,30 @@ class RobotsTxtParser:
 
         # Rules must match the following pattern:
         #   <key>[ \t]*:[ \t]*<value>
-        sep = line.find(":")
+        sep = line.find(b":")
         if sep == -1:
             # Google-specific optimization: some people forget the colon, so we need to
             # accept whitespace in its stead.
-            white = re.compile("|".join([" ", "\t"]))
-            sep = white.search(line)
-            if sep is not None:
-                sep = sep.start()
+            sep = line.find(b" ")
+            tab = line.find(b"\t")
+            if tab != -1 and (sep == -1 or tab < sep):
+                sep = tab
+            if sep != -1:
                 val = line[sep + 1 :]
                 if len(val) == 0:
                     raise SyntaxError("Syntax error in 'robots.txt' file.")
-                if white.search(val) is not None:
+                if b" " in val or b"\t" in val:
                     # We only accept whitespace as a separator if there are exactly two
                     # sequences of non-whitespace characters.  If we get here, there were
                     # more than 2 such sequences since we stripped trailing whitespace above.
-                    return "", "", False
+                    return b"", b"", False
 
         if sep == -1:
-            return "", "", False  # Couldn't find a separator.
+            return b"", b"", False  # Couldn't find a separator.
 
         key = line[:sep].strip()
         if len(key) == 0:
-            return "", "", False
+            return b"", b"", False
 
         value = line[sep + 1 :].strip()
 
@@ -89,55 +133,19 @@ class RobotsTxtParser:
         else:
             return True
 
-    def maybe_escape_pattern(self, path: str):
-        need_capitalize = False
-        num_to_escape = 0
-
-        def s(i):
-            if i < len(path):
-                return path[i]
-            return ""
-
-        # First, scan the buffer to see if changes are needed. Most don't.
-        for i in range(len(path)):
-            # (a) % escape sequence.
-            if path[i] == "%" and ishexdigit(s(i + 1)) and ishexdigit(s(i + 2)):
-                if s(i + 1).islower() or s(i + 2).islower():
-                    need_capitalize = True
-            elif not path[i].isascii():
-                # (b) needs escaping.
-                num_to_escape += 1
-            # (c) Already escaped and escape-characters normalized (eg. %2f -> %2F).
-
-        # Return if no changes needed.
-        if num_to_escape == 0 and not need_capitalize:
-            return path
-
-        dst = io.BytesIO()
-        i = 0
-        while (i < len(path)):
-            if path[i] == '%' and ishexdigit(s(i + 1)) and ishexdigit(s(i + 2)):
-              # (a) Normalize %-escaped sequence (eg. %2f -> %2F).
-              dst.write(b'%')
-              i += 1
-              dst.write(path[i].upper().encode())
-              i += 1
-              dst.write(path[i].upper().encode())
-            elif not path[i].isascii():
-                # (b) %-escape octets whose highest bit is set. These are outside the ASCII range
-                dst.write(b'%')
-                dst.write(path[i].encode().hex('%').upper().encode())
-            else:
-                # (c) Normal character, no modification needed.
-                dst.write(path[i].encode())
-            i += 1
-
-        return dst.getvalue().decode('utf-8')
+    def maybe_escape_pattern(self, path):
+        return maybe_escape_pattern(path)
 
     def emit_key_value_to_handler(self, line, key, value, handler):
         key_type = key.type()
 
-        if key_type == ParsedRobotsKey.KeyType.USER_AGENT:
+        if handler is self._handler:
+            handle_directive = self._handle_directive
+        else:
+            handle_directive = getattr(handler, "handle_directive", None)
+        if handle_directive is not None and key_type != ParsedRobotsKey.KeyType.UNKNOWN:
+            handle_directive(line, key_type, value)
+        elif key_type == ParsedRobotsKey.KeyType.USER_AGENT:
             handler.handle_user_agent(line, value)
         elif key_type == ParsedRobotsKey.KeyType.ALLOW:
             handler.handle_allow(line, value)
@@ -148,7 +156,7 @@ class RobotsTxtParser:
         elif key_type == ParsedRobotsKey.KeyType.UNKNOWN:
             handler.handle_unknown_action(line, key.unknown_key(), value)
 
-    def parse_and_emit_line(self, current_line: int, line: str):
+    def parse_and_emit_line(self, current_line: int, line: bytes):
         string_key, value, ok = self.get_key_and_value_from(line)
         if not ok:
             return
@@ -159,11 +167,12 @@ class RobotsTxtParser:
         if self.need_escape_value_for_key(key):
             value = self.maybe_escape_pattern(value)
 
+        # Handlers get str values. Escaped patterns are plain ASCII by now.
+        value = value.decode("utf-8", "replace")
+
         self.emit_key_value_to_handler(current_line, key, value, self._handler)
 
     def parse(self):
-        utf_bom = bytes([0xEF, 0xBB, 0xBF])
-
         # Certain browsers limit the URL length to 2083 bytes. In a robots.txt, it's
         # fairly safe to assume any valid line isn't going to be more than many times
         # that max url length of 2KB. We want some padding for
@@ -171,46 +180,23 @@ class RobotsTxtParser:
         # If so, we can ignore the chars on a line past that.
         kmax_line_len = 2083 * 8
 
+        body = bytes(self._robots_body)
         self._handler.handle_robots_start()
 
-        length = len(self._robots_body)
+        # Skip BOM if present - including partial BOMs.
         cur = 0
+        if body[:1] == b"\xef":
+            for bom in _UTF_BOMS:
+                if body.startswith(bom):
+                    cur = len(bom)
+                    break
+
+        # bytes.splitlines() breaks lines on LF, CR and CRLF only, which are
+        # exactly the line endings accepted in robots.txt.
+        for line_num, line in enumerate(body[cur:].splitlines(), 1):
+            # Add to current line, as long as there's room.
+            if len(line) > kmax_line_len - 1:
+                line = line[: kmax_line_len - 1]
+            self.parse_and_emit_line(line_num, line)
 
-        # Skip BOM if present - including partial BOMs.
-        for i in range(len(utf_bom)):
-            if cur == length:
-                break
-            b = self._robots_body[cur]
-            if b != utf_bom[i]:
-                break
-            cur += 1
-
-        line_num = 0
-        last_was_carriage_return = False
-
-        start = cur
-        end = cur
-
-        while True:
-            if cur == length:
-                break
-            b = self._robots_body[cur]
-            cur += 1
-            if b != 0x0A and b != 0x0D:  # Non-line-ending char case.
-                # Add to current line, as long as there's room.
-                if end - start < kmax_line_len - 1:
-                    end += 1
-            else:
-                is_CRLF_continuation = (
-                    (end == start) and last_was_carriage_return and (b == 0x0A)
-                )
-                if not is_CRLF_continuation:
-                    line_num += 1
-                    self.parse_and_emit_line(line_num, self._robots_body[start:end].decode('utf-8', 'replace'))
-                start = cur
-                end = cur
-                last_was_carriage_return = b == 0x0D
-
-        line_num += 1
-        self.parse_and_emit_line(line_num, self._robots_body[start:end].decode('utf-8', 'replace'))
         self._handler.handle_robots_end()
@@ -0,0 +1,157 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#
+# Micro-benchmarks of the parser and matcher hot paths, using only timeit.
+# Usage:
+#     python robots_benchmark.py [--number N] [--repeat R] [--baseline FILE] [--save FILE]
+# Arguments:
+# --number, --repeat: passed to timeit.Timer.repeat(); the best run is kept.
+# --baseline: a file written by --save on an earlier run. Benchmarks more than
+#   --tolerance (5% by default) slower than in the baseline are reported.
+# --save: writes the results, in microseconds per call, as JSON.
+# Return code:
+#   0 when no benchmark regressed against the baseline (or without baseline).
+#   1 when at least one benchmark regressed, or when the wildcard patterns of
+#     the large robots.txt are no longer matched with a single automaton.
+
+import argparse
+import json
+import sys
+import timeit
+
+from gpyrobotstxt.robots_cc import RobotsMatcher, clear_compile_cache
+from gpyrobotstxt.robotstxtparser import RobotsTxtParser
+
+
+class NullHandler:
+    def handle_robots_start(self):
+        pass
+
+    def handle_robots_end(self):
+        pass
+
+    def handle_directive(self, line_num, key_type, value):
+        pass
+
+    def handle_unknown_action(self, line_num, action, value):
+        pass
+
+
+UNIX_FILE = (
+    b"User-Agent: foo\n"
+    b"Allow: /some/path\n"
+    b"User-Agent: bar\n"
+    b"\n"
+    b"\n"
+    b"Disallow: /\n"
+)
+
+# A larger robots.txt, with the kinds of patterns found in the wild.
+LARGE_FILE = b"".join(
+    [b"\xEF\xBB\xBF", b"Sitemap: http://foo.bar/sitemap.xml\n", b"User-agent: *\n"]
+    + [b"Disallow: /dir%d/\nAllow: /dir%d/page%d.html$\nDisallow: /*/tmp%d*.php$\n" % (i, i, i, i) for i in range(100)]
+    + [b"User-agent: FooBot\n", b"Disallow: /private/\n", b"Allow: /private/*.css$\n"]
+)
+
+CORPORA = {
+    "unix_file": UNIX_FILE,
+    "dos_file": UNIX_FILE.replace(b"\n", b"\r\n"),
+    "mac_file": UNIX_FILE.replace(b"\n", b"\r"),
+    "large_file": LARGE_FILE,
+}
+
+URLS = ["http://foo.bar/dir%d/page%d.html" % (i % 120, i % 80) for i in range(1000)] + [
+    "http://foo.bar/a/tmp%d.php" % i for i in range(200)
+]
+
+
+def benchmarks():
+    # Yields (name, callable) pairs. Caches are cleared where the point is to
+    # measure the work they save.
+    for name, body in CORPORA.items():
+
+        def tokenize(body=body):
+            RobotsTxtParser(body, NullHandler()).parse()
+
+        def compile_body(body=body):
+            clear_compile_cache()
+            RobotsMatcher().compile(body)
+
+        yield f"parse/{name}", tokenize
+        yield f"compile/{name}", compile_body
+
+    matcher = RobotsMatcher()
+    robots = matcher.compile(LARGE_FILE)
+    rules = matcher.prepare(LARGE_FILE, ["BarBot"])
+    url = URLS[0]
+
+    yield "allowed_by_robots/large_file", lambda: matcher.allowed_by_robots(LARGE_FILE, ["BarBot"], url)
+    yield "compiled.allowed_by_robots/large_file", lambda: robots.allowed_by_robots(["BarBot"], url)
+    yield "prepared.filter_allowed/large_file", lambda: rules.filter_allowed(URLS)
+
+
+def exhausted_automata():
+    # Sides of the prepared LARGE_FILE rules whose MultiPatternAutomaton gave
+    # up on URLS. The timings only show that as a slowdown, which a baseline
+    # saved after the fact would not catch.
+    rules = RobotsMatcher().prepare(LARGE_FILE, ["BarBot"])
+    rules.filter_allowed(URLS)
+    sides = {"allow": rules._allow, "disallow": rules._disallow}
+    return [side for side, (_, _, _, automaton) in sides.items() if automaton is not None and automaton._exhausted]
+
+
+def get_script_arguments():
+    parser = argparse.ArgumentParser(description="RobotsTxt benchmarks")
+    parser.add_argument("--number", type=int, default=200, help="calls per timing run.")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark.")
+    parser.add_argument("--baseline", type=str, help="results of an earlier run, saved with --save.")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="allowed slowdown against the baseline.")
+    parser.add_argument("--save", type=str, help="file to save the results to.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = get_script_arguments()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = {}
+    regressions = 0
+    for name, func in benchmarks():
+        best = min(timeit.Timer(func).repeat(repeat=args.repeat, number=args.number)) / args.number
+        results[name] = best * 1e6
+
+        line = f"{name:45s} {results[name]:12.2f} us"
+        if name in baseline:
+            ratio = results[name] / baseline[name]
+            line += f"  {ratio:6.2f}x"
+            if ratio > 1 + args.tolerance:
+                line += "  REGRESSION"
+                regressions += 1
+        print(line)
+
+    for side in exhausted_automata():
+        print(f"automaton/large_file/{side}: EXHAUSTED, patterns matched one by one")
+        regressions += 1
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,214 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# This file checks that a robots.txt compiled with RobotsMatcher.compile()
+# gives the same answers as RobotsMatcher used as a streaming parse handler.
+
+import random
+import unittest
+
+from gpyrobotstxt.robots_cc import RobotsMatcher, _parse_rules, clear_compile_cache, get_path_params_query
+from gpyrobotstxt.robotsmatchstrategy import RobotsMatchStrategy
+from gpyrobotstxt.robotstxtparser import RobotsTxtParser
+
+
+ROBOTSTXTS = (
+    "",
+    "user-agent: FooBot\n"
+    "disallow: /\n",
+    "allow: /foo/bar/\n"
+    "\n"
+    "user-agent: FooBot\n"
+    "disallow: /\n"
+    "allow: /x/\n"
+    "user-agent: BarBot\n"
+    "disallow: /\n"
+    "allow: /y/\n"
+    "\n"
+    "\n"
+    "allow: /w/\n"
+    "user-agent: BazBot\n"
+    "\n"
+    "user-agent: FooBot\n"
+    "allow: /z/\n"
+    "disallow: /\n",
+    "User-agent: BarBot\n"
+    "Sitemap: https://foo.bar/sitemap\n"
+    "User-agent: *\n"
+    "Disallow: /\n",
+    "User-Agent: *\n"
+    "Disallow: /\n"
+    "User-Agent: Foo Bar\n"
+    "Allow: /x/\n"
+    "Disallow: /\n",
+    "User-agent: *\n"
+    "Disallow: /x/\n"
+    "NoSeparator\n"
+    "User-agent: FooBot\n"
+    "Disallow: /y/\n",
+    "user-agent: FooBot\n"
+    "disallow: \n"
+    "allow: \n",
+    "user-agent: FooBot\n"
+    "allow: /x/page.\n"
+    "disallow: /*.html\n",
+    "User-Agent: *\n"
+    "Allow: /allowed-slash/index.html\n"
+    "Disallow: /\n",
+    "user-agent: FooBot\n"
+    "disallow: /\n"
+    "allow: /*.php$\n"
+    "allow: /fish*\n"
+    "disallow: /$\n",
+    "User-agent: FooBot\n"
+    "Disallow: /\n"
+    "Allow: /foo/bar/ツ\n",
+)
+
+URLS = (
+    "",
+    "http://foo.bar/",
+    "http://foo.bar/x/y",
+    "http://foo.bar/y/page",
+    "http://foo.bar/z/d",
+    "http://foo.bar/foo/bar/",
+    "http://foo.bar/page.html",
+    "http://foo.bar/x/page.html",
+    "http://foo.bar/allowed-slash/",
+    "http://foo.bar/allowed-slash/index.htm",
+    "http://foo.bar/folder/filename.php",
+    "http://foo.bar/fishheads",
+    "http://foo.bar/foo/bar/%E3%83%84",
+)
+
+USER_AGENTS = (["FooBot"], ["foobot"], ["BarBot"], ["BazBot"], ["Foo"], ["QuxBot"], [""], ["BarBot", "FooBot"])
+
+
+def streaming_allowed_by_robots(robotstxt, user_agents, url):
+    matcher = RobotsMatcher()
+    matcher.init_user_agents_and_path(user_agents, get_path_params_query(url))
+    RobotsTxtParser(robotstxt.encode("utf-8"), matcher).parse()
+    return not matcher.disallow()
+
+
+class TestCompiledRobots(unittest.TestCase):
+    def test_same_answers_as_robots_matcher(self):
+        for robotstxt in ROBOTSTXTS:
+            compiled = RobotsMatcher().compile(robotstxt)
+            for user_agents in USER_AGENTS:
+                for url in URLS:
+                    self.assertEqual(
+                        streaming_allowed_by_robots(robotstxt, user_agents, url),
+                        compiled.allowed_by_robots(user_agents, url),
+                        f"{robotstxt!r} {user_agents} {url}",
+                    )
+
+    def test_filter_allowed(self):
+        for robotstxt in ROBOTSTXTS:
+            compiled = RobotsMatcher().compile(robotstxt)
+            for user_agents in USER_AGENTS:
+                self.assertEqual(
+                    [url for url in URLS if compiled.allowed_by_robots(user_agents, url)],
+                    compiled.filter_allowed(user_agents, URLS),
+                    f"{robotstxt!r} {user_agents}",
+                )
+
+    def test_prepare(self):
+        for robotstxt in ROBOTSTXTS:
+            for user_agents in USER_AGENTS:
+                rules = RobotsMatcher().prepare(robotstxt, user_agents)
+                for url in URLS:
+                    self.assertEqual(
+                        streaming_allowed_by_robots(robotstxt, user_agents, url),
+                        rules.allowed(url),
+                        f"{robotstxt!r} {user_agents} {url}",
+                    )
+
+    def test_parse_results_are_shared(self):
+        robotstxt = ROBOTSTXTS[2]
+        first = RobotsMatcher().compile(robotstxt)
+        second = RobotsMatcher().compile(robotstxt.encode("utf-8"))
+        self.assertIs(first._rules, second._rules)
+
+    def test_parse_results_are_shared_by_subclass_instances(self):
+        class Rfc7231Matcher(RobotsMatcher):
+            extract_user_agent = staticmethod(RobotsMatcher.extract_user_agent_rfc7231)
+
+        robotstxt = "user-agent: Foo2Bot\ndisallow: /\n"
+        first = Rfc7231Matcher().compile(robotstxt)
+        self.assertIs(first._rules, Rfc7231Matcher().compile(robotstxt)._rules)
+        self.assertIsNot(first._rules, RobotsMatcher().compile(robotstxt)._rules)
+        self.assertFalse(first.allowed_by_robots(["Foo2Bot"], "http://foo.bar/x"))
+
+    def test_bytes_like_bodies(self):
+        robotstxt = ROBOTSTXTS[2].encode("utf-8")
+        expected = RobotsMatcher().compile(robotstxt)._rules
+        for body in (bytearray(robotstxt), memoryview(robotstxt)):
+            with self.subTest(body=type(body).__name__):
+                self.assertIs(expected, RobotsMatcher().compile(body)._rules)
+                self.assertFalse(RobotsMatcher().allowed_by_robots(body, ["FooBot"], "http://foo.bar/y/"))
+
+    def test_clear_compile_cache(self):
+        robotstxt = ROBOTSTXTS[2]
+        first = RobotsMatcher().compile(robotstxt)
+        clear_compile_cache()
+        self.assertEqual(0, _parse_rules.cache_info().currsize)
+        self.assertIsNot(first._rules, RobotsMatcher().compile(robotstxt)._rules)
+
+    def test_patterns_are_ordered_once_per_user_agents(self):
+        rules = RobotsMatcher().compile(ROBOTSTXTS[2])._rules
+        allow, disallow = rules.patterns_for(["FooBot"])
+        self.assertEqual(("/x/", "/z/"), tuple(sorted(allow)))
+        self.assertEqual(("/", "/"), disallow)
+        self.assertIs(rules.patterns_for(["foobot"]), rules.patterns_for(["FooBot"]))
+
+    def test_many_wildcard_patterns(self):
+        # Long wildcard patterns that need more DFA states than the
+        # MultiPatternAutomaton keeps: AgentRules matches them one by one.
+        rnd = random.Random(0)
+        patterns = ["/" + "*".join(rnd.choices("abcdefgh", k=8)) + "$" for _ in range(300)]
+        robotstxt = "user-agent: *\n" + "".join(
+            f"{'allow' if i % 3 else 'disallow'}: {pattern}\n" for i, pattern in enumerate(patterns)
+        )
+        paths = ["/" + "".join(rnd.choices("abcdefgh", k=rnd.randint(8, 40))) for _ in range(100)]
+
+        rules = RobotsMatcher().prepare(robotstxt, ["FooBot"])
+        strategy = RobotsMatchStrategy()
+        for path in paths:
+            allow = max((len(p) for i, p in enumerate(patterns) if i % 3 and strategy.match_nfa(path, p)), default=-1)
+            disallow = max((len(p) for i, p in enumerate(patterns) if not i % 3 and strategy.match_nfa(path, p)), default=-1)
+            expected = disallow <= allow if allow > 0 or disallow > 0 else True
+            self.assertEqual(expected, rules.allowed("http://foo.bar" + path), path)
+        self.assertTrue(rules._allow[3]._exhausted)
+
+    def test_many_similar_wildcard_patterns(self):
+        # A hundred wildcard patterns like those of robots_benchmark.py need
+        # about 500 DFA states, which the MultiPatternAutomaton keeps.
+        robotstxt = "user-agent: *\n" + "".join(
+            f"disallow: /dir{i}/\nallow: /dir{i}/page{i}.html$\ndisallow: /*/tmp{i}*.php$\n" for i in range(100)
+        )
+        urls = [f"http://foo.bar/dir{i % 120}/page{i % 80}.html" for i in range(300)]
+        urls += [f"http://foo.bar/a/tmp{i}.php" for i in range(200)]
+
+        rules = RobotsMatcher().prepare(robotstxt, ["FooBot"])
+        allowed = rules.filter_allowed(urls)
+        self.assertFalse(rules._disallow[3]._exhausted)
+        # Streaming is slow on that many rules: a sample of the URLs is enough.
+        for url in urls[::10]:
+            self.assertEqual(streaming_allowed_by_robots(robotstxt, ["FooBot"], url), url in allowed, url)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,31 +26,43 @@ import unittest
 from gpyrobotstxt.robots_cc import get_path_params_query
 
 
-class TestGetPathParamsQuery(unittest.TestCase):
-    def TestPath(self, url, expected_path):
-        self.assertEqual(expected_path, get_path_params_query(url))
+# Only testing URLs that are already correctly escaped here.
+CASES = (
+    ("", "/"),
+    ("http://www.example.com", "/"),
+    ("http://www.example.com/", "/"),
+    ("http://www.example.com/a", "/a"),
+    ("http://www.example.com/a/", "/a/"),
+    ("http://www.example.com/a/b?c=http://d.e/", "/a/b?c=http://d.e/"),
+    ("http://www.example.com/a/b?c=d&e=f#fragment", "/a/b?c=d&e=f"),
+    ("example.com", "/"),
+    ("example.com/", "/"),
+    ("example.com/a", "/a"),
+    ("example.com/a/", "/a/"),
+    ("example.com/a/b?c=d&e=f#fragment", "/a/b?c=d&e=f"),
+    ("a", "/"),
+    ("a/", "/"),
+    ("/a", "/a"),
+    ("a/b", "/b"),
+    ("example.com?a", "/?a"),
+    ("example.com/a;b#c", "/a;b"),
+    ("//a/b/c", "/b/c"),
+)
+
+BYTES_CASES = tuple((url.encode("utf-8"), path.encode("utf-8")) for url, path in CASES)
+
 
+class TestGetPathParamsQuery(unittest.TestCase):
     def test_get_path_params_query(self):
-        # Only testing URLs that are already correctly escaped here.
-        self.TestPath("", "/")
-        self.TestPath("http://www.example.com", "/")
-        self.TestPath("http://www.example.com/", "/")
-        self.TestPath("http://www.example.com/a", "/a")
-        self.TestPath("http://www.example.com/a/", "/a/")
-        self.TestPath("http://www.example.com/a/b?c=http://d.e/", "/a/b?c=http://d.e/")
-        self.TestPath("http://www.example.com/a/b?c=d&e=f#fragment", "/a/b?c=d&e=f")
-        self.TestPath("example.com", "/")
-        self.TestPath("example.com/", "/")
-        self.TestPath("example.com/a", "/a")
-        self.TestPath("example.com/a/", "/a/")
-        self.TestPath("example.com/a/b?c=d&e=f#fragment", "/a/b?c=d&e=f")
-        self.TestPath("a", "/")
-        self.TestPath("a/", "/")
-        self.TestPath("/a", "/a")
-        self.TestPath("a/b", "/b")
-        self.TestPath("example.com?a", "/?a")
-        self.TestPath("example.com/a;b#c", "/a;b")
-        self.TestPath("//a/b/c", "/b/c")
+        for url, expected_path in CASES:
+            with self.subTest(url=url):
+                self.assertEqual(expected_path, get_path_params_query(url))
+
+    def test_get_path_params_query_bytes(self):
+        for url, expected_path in BYTES_CASES:
+            with self.subTest(url=url):
+                self.assertEqual(expected_path, get_path_params_query(url))
+
 
 if __name__ == "__main__":
     unittest.main()
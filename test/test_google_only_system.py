@@ -21,35 +21,421 @@
 #
 # Converted 2023-11-17, from https://github.com/google/robotstxt/blob/master/robots.cc
 
+import functools
 import unittest
 
 from gpyrobotstxt.robots_cc import RobotsMatcher
 
 
-class TestGoogleOnlySystem(unittest.TestCase):
-    def setUp(self):
-        self.robots_matcher = RobotsMatcher()
+@functools.lru_cache(maxsize=None)
+def _compile(robotstxt: bytes):
+    # Each robots.txt is parsed once, the checks only run the matching side.
+    # RobotsMatcher.allowed_by_robots() answers through the same compiled form.
+    return RobotsMatcher().compile(robotstxt)
+
+
+def _alternate_case(text: str) -> str:
+    # "user-agent" -> "uSeR-AgEnT"
+    return "".join(c.upper() if i % 2 else c.lower() for i, c in enumerate(text))
+
+
+def _rep_lines(case) -> bytes:
+    # One FooBot group, with its line names spelled in the given case.
+    user_agent, allow, disallow = map(case, ("user-agent", "allow", "disallow"))
+    return f"{user_agent}: FooBot\n{allow}: /x/\n{disallow}: /\n".encode()
+
+
+def _user_agent_lines(case) -> bytes:
+    # One "foo bar" group, with its user-agent value spelled in the given case.
+    return f"User-Agent: {case('foo bar')}\nAllow: /x/\nDisallow: /\n".encode()
+
+
+# robots.txt bodies used by the tests below, by name. They are kept as bytes,
+# which the parser consumes directly.
+_FIXTURES = {
+    "foobot_disallow_all": (
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+    ),
+    "line_syntax_incorrect": (
+        b"foo: FooBot\n"
+        b"bar: /\n"
+    ),
+    "line_syntax_incorrect_accepted": (
+        b"user-agent FooBot\n"
+        b"disallow /\n"
+    ),
+    "groups": (
+        b"allow: /foo/bar/\n"
+        b"\n"
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+        b"allow: /x/\n"
+        b"user-agent: BarBot\n"
+        b"disallow: /\n"
+        b"allow: /y/\n"
+        b"\n"
+        b"\n"
+        b"allow: /w/\n"
+        b"user-agent: BazBot\n"
+        b"\n"
+        b"user-agent: FooBot\n"
+        b"allow: /z/\n"
+        b"disallow: /\n"
+    ),
+    "groups_sitemap": (
+        b"User-agent: BarBot\n"
+        b"Sitemap: https://foo.bar/sitemap\n"
+        b"User-agent: *\n"
+        b"Disallow: /\n"
+    ),
+    "groups_unknown_line": (
+        b"User-agent: FooBot\n"
+        b"Invalid-Unknown-Line: unknown\n"
+        b"User-agent: *\n"
+        b"Disallow: /\n"
+    ),
+    "rep_lines_upper": _rep_lines(str.upper),
+    "rep_lines_lower": _rep_lines(str.lower),
+    "rep_lines_camel": _rep_lines(_alternate_case),
+    "user_agent_upper": _user_agent_lines(str.upper),
+    "user_agent_lower": _user_agent_lines(str.lower),
+    "user_agent_camel": _user_agent_lines(_alternate_case),
+    "user_agent_first_space": (
+        b"User-Agent: *\n"
+        b"Disallow: /\n"
+        b"User-Agent: Foo Bar\n"
+        b"Allow: /x/\n"
+        b"Disallow: /\n"
+    ),
+    "global_group": (
+        b"user-agent: *\n"
+        b"allow: /\n"
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+    ),
+    "only_specific_groups": (
+        b"user-agent: FooBot\n"
+        b"allow: /\n"
+        b"user-agent: BarBot\n"
+        b"disallow: /\n"
+        b"user-agent: BazBot\n"
+        b"disallow: /\n"
+    ),
+    "lowercase_url": (
+        b"user-agent: FooBot\n"
+        b"disallow: /x/\n"
+    ),
+    "uppercase_url": (
+        b"user-agent: FooBot\n"
+        b"disallow: /X/\n"
+    ),
+    "longest_disallow_page": (
+        b"user-agent: FooBot\n"
+        b"disallow: /x/page.html\n"
+        b"allow: /x/\n"
+    ),
+    "longest_allow_page": (
+        b"user-agent: FooBot\n"
+        b"allow: /x/page.html\n"
+        b"disallow: /x/\n"
+    ),
+    "longest_empty": (
+        b"user-agent: FooBot\n"
+        b"disallow: \n"
+        b"allow: \n"
+    ),
+    "longest_root": (
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+        b"allow: /\n"
+    ),
+    "longest_dir": (
+        b"user-agent: FooBot\n"
+        b"disallow: /x\n"
+        b"allow: /x/\n"
+    ),
+    "longest_same_page": (
+        b"user-agent: FooBot\n"
+        b"disallow: /x/page.html\n"
+        b"allow: /x/page.html\n"
+    ),
+    "longest_wildcard": (
+        b"user-agent: FooBot\n"
+        b"allow: /page\n"
+        b"disallow: /*.html\n"
+    ),
+    "longest_wildcard_dir": (
+        b"user-agent: FooBot\n"
+        b"allow: /x/page.\n"
+        b"disallow: /*.html\n"
+    ),
+    "longest_specific_group": (
+        b"User-agent: *\n"
+        b"Disallow: /x/\n"
+        b"User-agent: FooBot\n"
+        b"Disallow: /y/\n"
+    ),
+    "encoding_query": (
+        b"User-agent: FooBot\n"
+        b"Disallow: /\n"
+        b"Allow: /foo/bar?qux=taz&baz=http://foo.bar?tar&par\n"
+    ),
+    "encoding_utf8": (
+        "User-agent: FooBot\n"
+        "Disallow: /\n"
+        "Allow: /foo/bar/ツ\n"
+    ).encode("utf-8"),
+    "encoding_percent_utf8": (
+        b"User-agent: FooBot\n"
+        b"Disallow: /\n"
+        b"Allow: /foo/bar/%E3%83%84\n"
+    ),
+    "encoding_percent_unreserved": (
+        b"User-agent: FooBot\n"
+        b"Disallow: /\n"
+        b"Allow: /foo/bar/%62%61%7A\n"
+    ),
+    "special_wildcard": (
+        b"User-agent: FooBot\n"
+        b"Disallow: /foo/bar/quz\n"
+        b"Allow: /foo/*/qux\n"
+    ),
+    "special_end": (
+        b"User-agent: FooBot\n"
+        b"Disallow: /foo/bar$\n"
+        b"Allow: /foo/bar/qux\n"
+    ),
+    "special_comment": (
+        b"User-agent: FooBot\n"
+        b"# Disallow: /\n"
+        b"Disallow: /foo/quz#qux\n"
+        b"Allow: /\n"
+    ),
+    "index_html": (
+        b"User-Agent: *\n"
+        b"Allow: /allowed-slash/index.html\n"
+        b"Disallow: /\n"
+    ),
+    "doc_fish": (
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+        b"allow: /fish\n"
+    ),
+    "doc_fish_star": (
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+        b"allow: /fish*\n"
+    ),
+    "doc_fish_slash": (
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+        b"allow: /fish/\n"
+    ),
+    "doc_php": (
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+        b"allow: /*.php\n"
+    ),
+    "doc_php_end": (
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+        b"allow: /*.php$\n"
+    ),
+    "doc_fish_star_php": (
+        b"user-agent: FooBot\n"
+        b"disallow: /\n"
+        b"allow: /fish*.php\n"
+    ),
+    "doc_precedence_p": (
+        b"user-agent: FooBot\n"
+        b"allow: /p\n"
+        b"disallow: /\n"
+    ),
+    "doc_precedence_folder": (
+        b"user-agent: FooBot\n"
+        b"allow: /folder\n"
+        b"disallow: /folder\n"
+    ),
+    "doc_precedence_page": (
+        b"user-agent: FooBot\n"
+        b"allow: /page\n"
+        b"disallow: /*.htm\n"
+    ),
+    "doc_precedence_end": (
+        b"user-agent: FooBot\n"
+        b"allow: /$\n"
+        b"disallow: /\n"
+    ),
+}
+
+# URLs checked by several of the tests below.
+_URLS = {
+    "host": "http://foo.bar",
+    "bar": "http://foo.bar/bar",
+    "xy": "http://foo.bar/x/y",
+    "x_page": "http://foo.bar/x/page.html",
+    "fish": "http://foo.bar/fish",
+    "fish_html": "http://foo.bar/fish.html",
+    "fish_salmon": "http://foo.bar/fish/salmon.html",
+}
+
+
+# Google-specific: system test.
+SYSTEM_CASES = (
+    # Empty robots.txt: everything allowed.
+    ("", "FooBot", "", True),
+    # All params empty: same as robots.txt empty, everything allowed.
+    ("", "", "", True),
+    # Empty user-agent to be matched: everything allowed.
+    (_FIXTURES["foobot_disallow_all"], "", "", True),
+    # Empty url: implicitly allowed.
+    (_FIXTURES["foobot_disallow_all"], "FooBot", "", False),
+)
+
+# The most specific match found MUST be used. The most specific match is the
+# match that has the most octets. In case of multiple rules with the same
+# length, the least strict rule must be used.
+# See REP RFC section "The Allow and Disallow lines".
+# https://www.rfc-editor.org/rfc/rfc9309.html#section-2.2.2
+LONGEST_MATCH_CASES = (
+    (_FIXTURES["longest_disallow_page"], "FooBot", _URLS["x_page"], False),
+    (_FIXTURES["longest_allow_page"], "FooBot", _URLS["x_page"], True),
+    (_FIXTURES["longest_allow_page"], "FooBot", "http://foo.bar/x/", False),
+    (_FIXTURES["longest_empty"], "FooBot", _URLS["x_page"], True),
+    (_FIXTURES["longest_root"], "FooBot", _URLS["x_page"], True),
+    (_FIXTURES["longest_dir"], "FooBot", "http://foo.bar/x", False),
+    (_FIXTURES["longest_dir"], "FooBot", "http://foo.bar/x/", True),
+    # In case of equivalent disallow and allow patterns for the same user-agent, allow is used.
+    (_FIXTURES["longest_same_page"], "FooBot", _URLS["x_page"], True),
+    # Longest match wins.
+    (_FIXTURES["longest_wildcard"], "FooBot", "http://foo.bar/page.html", False),
+    (_FIXTURES["longest_wildcard"], "FooBot", "http://foo.bar/page", True),
+    # Longest match wins.
+    (_FIXTURES["longest_wildcard_dir"], "FooBot", "http://foo.bar/page.html", False),
+    (_FIXTURES["longest_wildcard_dir"], "FooBot", "http://foo.bar/page", True),
+    # Most specific group for FooBot allows implicitly /x/page.
+    (_FIXTURES["longest_specific_group"], "FooBot", "http://foo.bar/x/page", True),
+    (_FIXTURES["longest_specific_group"], "FooBot", "http://foo.bar/y/page", False),
+)
+
+# Test documentation from https://developers.google.com/search/reference/robots_txt
+# Checks are grouped by robots.txt: (fixture name, useragent, ((url, expected), ...)).
+DOCUMENTATION_CASES = (
+    # Section "URL matching based on path values".
+    ("doc_fish", "FooBot", (
+        (_URLS["bar"], False),
+        (_URLS["fish"], True),
+        (_URLS["fish_html"], True),
+        (_URLS["fish_salmon"], True),
+        ("http://foo.bar/fishheads", True),
+        ("http://foo.bar/fishheads/yummy.html", True),
+        ("http://foo.bar/fish.html?id=anything", True),
+        ("http://foo.bar/Fish.asp", False),
+        ("http://foo.bar/catfish", False),
+        ("http://foo.bar/?id=fish", False),
+    )),
+    # "/fish*" equals "/fish"
+    ("doc_fish_star", "FooBot", (
+        (_URLS["bar"], False),
+        (_URLS["fish"], True),
+        (_URLS["fish_html"], True),
+        (_URLS["fish_salmon"], True),
+        ("http://foo.bar/fishheads", True),
+        ("http://foo.bar/fishheads/yummy.html", True),
+        ("http://foo.bar/fish.html?id=anything", True),
+        ("http://foo.bar/Fish.bar", False),
+        ("http://foo.bar/catfish", False),
+        ("http://foo.bar/?id=fish", False),
+    )),
+    # "/fish/" does not equal "/fish"
+    ("doc_fish_slash", "FooBot", (
+        (_URLS["bar"], False),
+        ("http://foo.bar/fish/", True),
+        ("http://foo.bar/fish/salmon", True),
+        ("http://foo.bar/fish/?salmon", True),
+        (_URLS["fish_salmon"], True),
+        ("http://foo.bar/fish/?id=anything", True),
+        (_URLS["fish"], False),
+        (_URLS["fish_html"], False),
+        ("http://foo.bar/Fish/Salmon.html", False),
+    )),
+    # "/*.php"
+    ("doc_php", "FooBot", (
+        (_URLS["bar"], False),
+        ("http://foo.bar/filename.php", True),
+        ("http://foo.bar/folder/filename.php", True),
+        ("http://foo.bar/folder/filename.php?parameters", True),
+        ("http://foo.bar//folder/any.php.file.html", True),
+        ("http://foo.bar/filename.php/", True),
+        ("http://foo.bar/index?f=filename.php/", True),
+        ("http://foo.bar/php/", False),
+        ("http://foo.bar/index?php", False),
+        ("http://foo.bar/windows.PHP", False),
+    )),
+    # "/*.php$"
+    ("doc_php_end", "FooBot", (
+        (_URLS["bar"], False),
+        ("http://foo.bar/filename.php", True),
+        ("http://foo.bar/folder/filename.php", True),
+        ("http://foo.bar/folder/filename.php?parameters", False),
+        ("http://foo.bar/filename.php/", False),
+        ("http://foo.bar/filename.php5", False),
+        ("http://foo.bar/php/", False),
+        ("http://foo.bar/filename?php", False),
+        ("http://foo.bar/aaaphpaaa", False),
+        ("http://foo.bar//windows.PHP", False),
+    )),
+    # "/fish*.php"
+    ("doc_fish_star_php", "FooBot", (
+        (_URLS["bar"], False),
+        ("http://foo.bar/fish.php", True),
+        ("http://foo.bar/fishheads/catfish.php?parameters", True),
+        ("http://foo.bar/Fish.PHP", False),
+    )),
+    # Section "Order of precedence for group-member records".
+    ("doc_precedence_p", "FooBot", (
+        ("http://example.com/page", True),
+    )),
+    ("doc_precedence_folder", "FooBot", (
+        ("http://example.com/folder/page", True),
+    )),
+    ("doc_precedence_page", "FooBot", (
+        ("http://example.com/page.htm", False),
+    )),
+    ("doc_precedence_end", "FooBot", (
+        ("http://example.com/", True),
+        ("http://example.com/page.html", False),
+    )),
+)
 
-    def is_user_agent_allowed(self, robotstxt: str, useragent: str, url: str):
-        return self.robots_matcher.one_agent_allowed_by_robots(
-            robotstxt, useragent, url
-        )
+
+class TestGoogleOnlySystem(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The checks go through _compile(), this matcher only answers
+        # is_valid_user_agent_to_obey(), which keeps no state.
+        cls.robots_matcher = RobotsMatcher()
+
+    def is_user_agent_allowed(self, robotstxt: bytes, useragent: str, url: str):
+        return _compile(robotstxt).one_agent_allowed_by_robots(useragent, url)
+
+    def check_cases(self, cases):
+        # cases are (robotstxt, useragent, url, expected) tuples.
+        for robotstxt, useragent, url, expected in cases:
+            with self.subTest(robotstxt=robotstxt, useragent=useragent, url=url):
+                self.assertEqual(expected, self.is_user_agent_allowed(robotstxt, useragent, url))
+
+    def check_all(self, robotstxt: bytes, cases):
+        # cases are (useragent, url, expected) tuples, all checked against robotstxt.
+        robots = _compile(robotstxt)
+        for useragent, url, expected in cases:
+            with self.subTest(useragent=useragent, url=url):
+                self.assertEqual(expected, robots.one_agent_allowed_by_robots(useragent, url))
 
     # Google-specific: system test.
     def test_GoogleOnly_System(self):
-        robotstxt = "user-agent: FooBot\n" "disallow: /\n"
-
-        # Empty robots.txt: everything allowed.
-        self.assertTrue(self.is_user_agent_allowed("", "FooBot", ""))
-
-        # All params empty: same as robots.txt empty, everything allowed.
-        self.assertTrue(self.is_user_agent_allowed("", "", ""))
-
-        # Empty user-agent to be matched: everything allowed.
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "", ""))
-
-        # Empty url: implicitly allowed.
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", ""))
+        self.check_cases(SYSTEM_CASES)
 
     # Rules are colon separated name-value pairs. The following names are provisioned:
     #     user-agent: <value>
@@ -61,14 +447,15 @@ class TestGoogleOnlySystem(unittest.TestCase):
     # Google specific: webmasters sometimes miss the colon separator, but it's
     # obvious what they mean by "disallow /", so we assume the colon if it's missing.
     def test_ID_LineSyntax_Line(self):
-        robotstxt_correct = "user-agent: FooBot\n" "disallow: /\n"
-        robotstxt_incorrect = "foo: FooBot\n" "bar: /\n"
-        robotstxt_incorrect_accepted = "user-agent FooBot\n" "disallow /\n"
-        url = "http://foo.bar/x/y"
+        url = _URLS["xy"]
 
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_correct, "FooBot", url))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_incorrect, "FooBot", url))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_incorrect_accepted, "FooBot", url))
+        self.check_cases(
+            (
+                (_FIXTURES["foobot_disallow_all"], "FooBot", url, False),
+                (_FIXTURES["line_syntax_incorrect"], "FooBot", url, True),
+                (_FIXTURES["line_syntax_incorrect_accepted"], "FooBot", url, False),
+            )
+        )
 
     # A group is one or more user-agent line followed by rules, and terminated
     # by a another user-agent line. Rules for same user-agents are combined
@@ -76,95 +463,50 @@ class TestGoogleOnlySystem(unittest.TestCase):
     # See REP RFC section "Protocol Definition".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.1
     def test_ID_LineSyntax_Groups(self):
-        robotstxt = (
-            "allow: /foo/bar/\n"
-            "\n"
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-            "allow: /x/\n"
-            "user-agent: BarBot\n"
-            "disallow: /\n"
-            "allow: /y/\n"
-            "\n"
-            "\n"
-            "allow: /w/\n"
-            "user-agent: BazBot\n"
-            "\n"
-            "user-agent: FooBot\n"
-            "allow: /z/\n"
-            "disallow: /\n"
-        )
-
         url_w = "http://foo.bar/w/a"
         url_x = "http://foo.bar/x/b"
         url_y = "http://foo.bar/y/c"
         url_z = "http://foo.bar/z/d"
         url_foo = "http://foo.bar/foo/bar/"
 
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url_x))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url_z))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", url_y))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "BarBot", url_y))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "BarBot", url_w))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "BarBot", url_z))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "BazBot", url_z))
-
-        # Lines with rules outside groups are ignored.
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", url_foo))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "BarBot", url_foo))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "BazBot", url_foo))
+        self.check_all(
+            _FIXTURES["groups"],
+            (
+                ("FooBot", url_x, True),
+                ("FooBot", url_z, True),
+                ("FooBot", url_y, False),
+                ("BarBot", url_y, True),
+                ("BarBot", url_w, True),
+                ("BarBot", url_z, False),
+                ("BazBot", url_z, True),
+                # Lines with rules outside groups are ignored.
+                ("FooBot", url_foo, False),
+                ("BarBot", url_foo, False),
+                ("BazBot", url_foo, False),
+            ),
+        )
 
     # Group must not be closed by rules not explicitly defined in the REP RFC.
     # See REP RFC section "Protocol Definition".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.1
     def test_ID_LineSyntax_Groups_OtherRules(self):
-        robotstxt1 = (
-            "User-agent: BarBot\n"
-            "Sitemap: https://foo.bar/sitemap\n"
-            "User-agent: *\n"
-            "Disallow: /\n"
-        )
-        robotstxt2 = (
-            "User-agent: FooBot\n"
-            "Invalid-Unknown-Line: unknown\n"
-            "User-agent: *\n"
-            "Disallow: /\n"
-        )
         url = "http://foo.bar/"
 
-        self.assertFalse(self.is_user_agent_allowed(robotstxt1, "FooBot", url))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt1, "BarBot", url))
-
-        self.assertFalse(self.is_user_agent_allowed(robotstxt2, "FooBot", url))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt2, "BarBot", url))
+        for name in ("groups_sitemap", "groups_unknown_line"):
+            with self.subTest(robotstxt=name):
+                self.check_all(_FIXTURES[name], (("FooBot", url, False), ("BarBot", url, False)))
 
     # REP lines are case insensitive. See REP RFC section "Protocol Definition".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.1
     def test_ID_REPLineNamesCaseInsensitive(self):
-        robotstxt_upper =(
-            "USER-AGENT: FooBot\n"
-            "ALLOW: /x/\n"
-            "DISALLOW: /\n"
-        )
-        robotstxt_lower = (
-            "user-agent: FooBot\n"
-            "allow: /x/\n"
-            "disallow: /\n"
-        )
-        robotstxt_camel = (
-            "uSeR-aGeNt: FooBot\n"
-            "AlLoW: /x/\n"
-            "dIsAlLoW: /\n"
-        )
-        url_allowed = "http://foo.bar/x/y"
+        url_allowed = _URLS["xy"]
         url_disallowed = "http://foo.bar/a/b"
 
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_upper, "FooBot", url_allowed))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_lower, "FooBot", url_allowed))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_camel, "FooBot", url_allowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_upper, "FooBot", url_disallowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_lower, "FooBot", url_disallowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_camel, "FooBot", url_disallowed))
+        for name in ("rep_lines_upper", "rep_lines_lower", "rep_lines_camel"):
+            robots = _compile(_FIXTURES[name])
+            with self.subTest(robotstxt=name):
+                self.assertTrue(robots.one_agent_allowed_by_robots("FooBot", url_allowed))
+                self.assertFalse(robots.one_agent_allowed_by_robots("FooBot", url_disallowed))
 
     # A user-agent line is expected to contain only [a-zA-Z_-] characters and must
     # not be empty. See REP RFC section "The user-agent line".
@@ -187,36 +529,15 @@ class TestGoogleOnlySystem(unittest.TestCase):
     # See REP RFC section "The user-agent line".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.2.1
     def test_ID_UserAgentValueCaseInsensitive(self):
-        robotstxt_upper = (
-            "User-Agent: FOO BAR\n"
-            "Allow: /x/\n"
-            "Disallow: /\n"
-        )
-        robotstxt_lower = (
-            "User-Agent: foo bar\n"
-            "Allow: /x/\n"
-            "Disallow: /\n"
-        )
-        robotstxt_camel = (
-            "User-Agent: FoO bAr\n"
-            "Allow: /x/\n"
-            "Disallow: /\n"
-        )
-        url_allowed = "http://foo.bar/x/y"
+        url_allowed = _URLS["xy"]
         url_disallowed = "http://foo.bar/a/b"
 
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_upper, "Foo", url_allowed))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_lower, "Foo", url_allowed))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_camel, "Foo", url_allowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_upper, "Foo", url_disallowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_lower, "Foo", url_disallowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_camel, "Foo", url_disallowed))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_upper, "foo", url_allowed))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_lower, "foo", url_allowed))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_camel, "foo", url_allowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_upper, "foo", url_disallowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_lower, "foo", url_disallowed))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_camel, "foo", url_disallowed))
+        for name in ("user_agent_upper", "user_agent_lower", "user_agent_camel"):
+            robots = _compile(_FIXTURES[name])
+            for useragent in ("Foo", "foo"):
+                with self.subTest(robotstxt=name, useragent=useragent):
+                    self.assertTrue(robots.one_agent_allowed_by_robots(useragent, url_allowed))
+                    self.assertFalse(robots.one_agent_allowed_by_robots(useragent, url_disallowed))
 
     # Google specific: accept user-agent value up to the first space. Space is not
     # allowed in user-agent values, but that doesn't stop webmasters from using
@@ -225,17 +546,9 @@ class TestGoogleOnlySystem(unittest.TestCase):
     # Extends REP RFC section "The user-agent line"
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.2.1
     def test_GoogleOnly_AcceptUserAgentUpToFirstSpace(self):
-        robotstxt = (
-            "User-Agent: *\n"
-            "Disallow: /\n"
-            "User-Agent: Foo Bar\n"
-            "Allow: /x/\n"
-            "Disallow: /\n"
-        )
-        url = "http://foo.bar/x/y"
+        url = _URLS["xy"]
 
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "Foo", url))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "Foo Bar", url))
+        self.check_all(_FIXTURES["user_agent_first_space"], (("Foo", url, True), ("Foo Bar", url, False)))
 
     # If no group matches the user-agent, crawlers must obey the first group with a
     # user-agent line with a "*" value, if present. If no group satisfies either
@@ -243,44 +556,29 @@ class TestGoogleOnlySystem(unittest.TestCase):
     # See REP RFC section "The user-agent line".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.2.1
     def test_ID_GlobalGroups_Secondary(self):
-        robotstxt_empty = ""
-        robotstxt_global = (
-            "user-agent: *\n"
-            "allow: /\n"
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-        )
-        robotstxt_only_specific = (
-            "user-agent: FooBot\n"
-            "allow: /\n"
-            "user-agent: BarBot\n"
-            "disallow: /\n"
-            "user-agent: BazBot\n"
-            "disallow: /\n"
-        )
-        url = "http://foo.bar/x/y"
+        url = _URLS["xy"]
 
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_empty, "FooBot", url))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_global, "FooBot", url))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_global, "BarBot", url))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_only_specific, "QuxBot", url))
+        self.check_cases(
+            (
+                (b"", "FooBot", url, True),
+                (_FIXTURES["global_group"], "FooBot", url, False),
+                (_FIXTURES["global_group"], "BarBot", url, True),
+                (_FIXTURES["only_specific_groups"], "QuxBot", url, True),
+            )
+        )
 
     # Matching rules against URIs is case sensitive.
     # See REP RFC section "The Allow and Disallow lines".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.2.2
     def test_ID_AllowDisallow_Value_CaseSensitive(self):
-        robotstxt_lowercase_url = (
-            "user-agent: FooBot\n"
-            "disallow: /x/\n"
-        )
-        robotstxt_uppercase_url = (
-            "user-agent: FooBot\n"
-            "disallow: /X/\n"
-        )
-        url = "http://foo.bar/x/y"
+        url = _URLS["xy"]
 
-        self.assertFalse(self.is_user_agent_allowed(robotstxt_lowercase_url, "FooBot", url))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt_uppercase_url, "FooBot", url))
+        self.check_cases(
+            (
+                (_FIXTURES["lowercase_url"], "FooBot", url, False),
+                (_FIXTURES["uppercase_url"], "FooBot", url, True),
+            )
+        )
 
     # The most specific match found MUST be used. The most specific match is the
     # match that has the most octets. In case of multiple rules with the same
@@ -288,82 +586,7 @@ class TestGoogleOnlySystem(unittest.TestCase):
     # See REP RFC section "The Allow and Disallow lines".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.2.2
     def test_ID_LongestMatch(self):
-        url = "http://foo.bar/x/page.html"
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /x/page.html\n"
-            "allow: /x/\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "allow: /x/page.html\n"
-            "disallow: /x/\n"
-        )
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/x/"))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: \n"
-            "allow: \n"
-        )
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-            "allow: /\n"
-        )
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-
-        url_a = "http://foo.bar/x"
-        url_b = "http://foo.bar/x/"
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /x\n"
-            "allow: /x/\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", url_a))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url_b))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /x/page.html\n"
-            "allow: /x/page.html\n"
-        )
-        # In case of equivalent disallow and allow patterns for the same user-agent, allow is used.
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "allow: /page\n"
-            "disallow: /*.html\n"
-        )
-        # Longest match wins.
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/page.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/page"))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "allow: /x/page.\n"
-            "disallow: /*.html\n"
-        )
-        # Longest match wins.
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/page.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/page"))
-
-        robotstxt = (
-            "User-agent: *\n"
-            "Disallow: /x/\n"
-            "User-agent: FooBot\n"
-            "Disallow: /y/\n"
-        )
-        # Most specific group for FooBot allows implicitly /x/page.
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/x/page"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/y/page"))
+        self.check_cases(LONGEST_MATCH_CASES)
 
     # Octets in the URI and robots.txt paths outside the range of the US-ASCII
     # coded character set, and those in the reserved range defined by RFC3986,
@@ -374,43 +597,24 @@ class TestGoogleOnlySystem(unittest.TestCase):
     # NOTE: It's up to the caller to percent encode a URL before passing it to the
     # parser. Percent encoding URIs in the rules is unnecessary.
     def test_ID_Encoding(self):
-        # /foo/bar?baz=http://foo.bar stays unencoded.
-        robotstxt =(
-            "User-agent: FooBot\n"
-            "Disallow: /\n"
-            "Allow: /foo/bar?qux=taz&baz=http://foo.bar?tar&par\n"
-        )
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar?qux=taz&baz=http://foo.bar?tar&par"))
-
-        # 3 byte character: /foo/bar/ツ -> /foo/bar/%E3%83%84
-        robotstxt =(
-            "User-agent: FooBot\n"
-            "Disallow: /\n"
-            "Allow: /foo/bar/ツ\n"
+        self.check_cases(
+            (
+                # /foo/bar?baz=http://foo.bar stays unencoded.
+                (_FIXTURES["encoding_query"], "FooBot", "http://foo.bar/foo/bar?qux=taz&baz=http://foo.bar?tar&par", True),
+                # 3 byte character: /foo/bar/ツ -> /foo/bar/%E3%83%84
+                (_FIXTURES["encoding_utf8"], "FooBot", "http://foo.bar/foo/bar/%E3%83%84", True),
+                # The parser encodes the 3-byte character, but the URL is not %-encoded.
+                (_FIXTURES["encoding_utf8"], "FooBot", "http://foo.bar/foo/bar/ツ", False),
+                # Percent encoded 3 byte character: /foo/bar/%E3%83%84 -> /foo/bar/%E3%83%84
+                (_FIXTURES["encoding_percent_utf8"], "FooBot", "http://foo.bar/foo/bar/%E3%83%84", True),
+                (_FIXTURES["encoding_percent_utf8"], "FooBot", "http://foo.bar/foo/bar/ツ", False),
+                # Percent encoded unreserved US-ASCII: /foo/bar/%62%61%7A -> NULL
+                # This is illegal according to RFC3986 and while it may work here due to
+                # simple string matching, it should not be relied on.
+                (_FIXTURES["encoding_percent_unreserved"], "FooBot", "http://foo.bar/foo/bar/baz", False),
+                (_FIXTURES["encoding_percent_unreserved"], "FooBot", "http://foo.bar/foo/bar/%62%61%7A", True),
+            )
         )
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/%E3%83%84"))
-        # The parser encodes the 3-byte character, but the URL is not %-encoded.
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/ツ"))
-
-        # Percent encoded 3 byte character: /foo/bar/%E3%83%84 -> /foo/bar/%E3%83%84
-        robotstxt =(
-            "User-agent: FooBot\n"
-            "Disallow: /\n"
-            "Allow: /foo/bar/%E3%83%84\n"
-        )
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/%E3%83%84"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/ツ"))
-
-        # Percent encoded unreserved US-ASCII: /foo/bar/%62%61%7A -> NULL
-        # This is illegal according to RFC3986 and while it may work here due to
-        # simple string matching, it should not be relied on.
-        robotstxt =(
-            "User-agent: FooBot\n"
-            "Disallow: /\n"
-            "Allow: /foo/bar/%62%61%7A\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/baz"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/%62%61%7A"))
 
     # The REP RFC defines the following characters that have special meaning in
     # robots.txt:
@@ -420,237 +624,89 @@ class TestGoogleOnlySystem(unittest.TestCase):
     # See REP RFC section "Special Characters".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.2.3
     def test_ID_SpecialCharacters(self):
-        robotstxt = (
-            "User-agent: FooBot\n"
-            "Disallow: /foo/bar/quz\n"
-            "Allow: /foo/*/qux\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/quz"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/quz"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo//quz"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bax/quz"))
-
-        robotstxt = (
-            "User-agent: FooBot\n"
-            "Disallow: /foo/bar$\n"
-            "Allow: /foo/bar/qux\n"
+        self.check_cases(
+            (
+                (_FIXTURES["special_wildcard"], "FooBot", "http://foo.bar/foo/bar/quz", False),
+                (_FIXTURES["special_wildcard"], "FooBot", "http://foo.bar/foo/quz", True),
+                (_FIXTURES["special_wildcard"], "FooBot", "http://foo.bar/foo//quz", True),
+                (_FIXTURES["special_wildcard"], "FooBot", "http://foo.bar/foo/bax/quz", True),
+                (_FIXTURES["special_end"], "FooBot", "http://foo.bar/foo/bar", False),
+                (_FIXTURES["special_end"], "FooBot", "http://foo.bar/foo/bar/qux", True),
+                (_FIXTURES["special_end"], "FooBot", "http://foo.bar/foo/bar/", True),
+                (_FIXTURES["special_end"], "FooBot", "http://foo.bar/foo/bar/baz", True),
+                (_FIXTURES["special_comment"], "FooBot", "http://foo.bar/foo/bar", True),
+                (_FIXTURES["special_comment"], "FooBot", "http://foo.bar/foo/quz", False),
+            )
         )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/qux"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar/baz"))
-
-        robotstxt = (
-            "User-agent: FooBot\n"
-            "# Disallow: /\n"
-            "Disallow: /foo/quz#qux\n"
-            "Allow: /\n"
-        )
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/bar"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/foo/quz"))
 
     # Google-specific: "index.html" (and only that) at the end of a pattern is equivalent to "/".
     def test_GoogleOnly_IndexHTMLisDirectory(self):
-        robotstxt = (
-            "User-Agent: *\n"
-            "Allow: /allowed-slash/index.html\n"
-            "Disallow: /\n"
+        self.check_all(
+            _FIXTURES["index_html"],
+            (
+                # If index.html is allowed, we interpret this as / being allowed too.
+                ("foobot", "http://foo.com/allowed-slash/", True),
+                # Does not exatly match.
+                ("FooBot", "http://foo.com/allowed-slash/index.htm", False),
+                # Exact match.
+                ("foobot", "http://foo.com/allowed-slash/index.html", True),
+                ("FooBot", "http://foo.com/anyother-url", False),
+            ),
         )
 
-        # If index.html is allowed, we interpret this as / being allowed too.
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "foobot", "http://foo.com/allowed-slash/"))
-        # Does not exatly match.
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.com/allowed-slash/index.htm"))
-        # Exact match.
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "foobot", "http://foo.com/allowed-slash/index.html"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.com/anyother-url"))
-
     # Google-specific: long lines are ignored after 8 * 2083 bytes.
     def test_GoogleOnly_LineTooLong(self):
         # Disallow rule pattern matches the URL after being cut off at max_line_len.
         eol_len = len("\n")
         max_line_len = 2083 * 8
-        allow = "allow: "
-        disallow = "disallow: "
-
-        robotstxt = "user-agent: FooBot\n"
-        longline = "/x/"
-        max_length = max_line_len - len(longline) - len(disallow) + eol_len
-
-        while len(longline) < max_length:
-            longline += "a"
-
-        robotstxt += disallow + longline + "/qux\n"
+        allow = b"allow: "
+        disallow = b"disallow: "
+
+        robotstxt = b"user-agent: FooBot\n"
+        max_length = max_line_len - len("/x/") - len(disallow) + eol_len
+        longline = "/x/" + "a" * (max_length - len("/x/"))
+        url_cut_off = _URLS["host"] + longline + "/fux"
+
+        robotstxt += disallow + longline.encode() + b"/qux\n"
+        # Each body is compiled once and queried for every URL; they are only
+        # used here, so they are not kept in the shared _compile() cache.
+        robots = self.robots_matcher.compile(robotstxt)
         # Matches nothing, so URL is allowed.
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fux"))
+        self.assertTrue(robots.one_agent_allowed_by_robots("FooBot", "http://foo.bar/fux"))
         # Matches cut off disallow rule.
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar" + longline + "/fux"))
-
-        robotstxt = (
-        "user-agent: FooBot\n"
-        "disallow: /\n"
-        )
-        longline_a = "/x/"
-        longline_b = "/x/"
-        max_length = max_line_len - len(longline_a) - len(allow) + eol_len
+        self.assertFalse(robots.one_agent_allowed_by_robots("FooBot", url_cut_off))
 
-        while len(longline_a) < max_length:
-            longline_a += "a"
-            longline_b += "b"
+        max_length = max_line_len - len("/x/") - len(allow) + eol_len
+        longline_a = "/x/" + "a" * (max_length - len("/x/"))
+        longline_b = "/x/" + "b" * (max_length - len("/x/"))
+        url_exact_a = _URLS["host"] + longline_a + "/qux"
+        url_cut_off_b = _URLS["host"] + longline_b + "/fux"
 
-        robotstxt += allow + longline_a + "/qux\n"
-        robotstxt += allow + longline_b + "/qux\n"
+        robotstxt = b"".join(
+            (
+                _FIXTURES["foobot_disallow_all"],
+                allow + longline_a.encode() + b"/qux\n",
+                allow + longline_b.encode() + b"/qux\n",
+            )
+        )
+        robots = self.robots_matcher.compile(robotstxt)
 
         # URL matches the disallow rule.
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar"))
+        self.assertFalse(robots.one_agent_allowed_by_robots("FooBot", _URLS["host"]))
         # Matches the allow rule exactly.
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar" + longline_a + "/qux"))
+        self.assertTrue(robots.one_agent_allowed_by_robots("FooBot", url_exact_a))
         # Matches cut off allow rule.
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar" + longline_b + "/fux"))
+        self.assertTrue(robots.one_agent_allowed_by_robots("FooBot", url_cut_off_b))
 
     # Test documentation from https://developers.google.com/search/reference/robots_txt
     def test_GoogleOnly_DocumentationChecks(self):
-        # Section "URL matching based on path values".
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-            "allow: /fish\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/bar"))
-
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish/salmon.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fishheads"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fishheads/yummy.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish.html?id=anything"))
-
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/Fish.asp"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/catfish"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/?id=fish"))
-
-        # "/fish*" equals "/fish"
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-            "allow: /fish*\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/bar"))
-
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish/salmon.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fishheads"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fishheads/yummy.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish.html?id=anything"))
-
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/Fish.bar"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/catfish"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/?id=fish"))
-
-        # "/fish/" does not equal "/fish"
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-            "allow: /fish/\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/bar"))
-
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish/"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish/salmon"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish/?salmon"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish/salmon.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish/?id=anything"))
-
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish.html"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/Fish/Salmon.html"))
-
-        # "/*.php"
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-            "allow: /*.php\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/bar"))
-
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/filename.php"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/folder/filename.php"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/folder/filename.php?parameters"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar//folder/any.php.file.html"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/filename.php/"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/index?f=filename.php/"))
-
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/php/"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/index?php"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/windows.PHP"))
-
-        # "/*.php$"
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-            "allow: /*.php$\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/bar"))
-
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/filename.php"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/folder/filename.php"))
-
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/folder/filename.php?parameters"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/filename.php/"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/filename.php5"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/php/"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/filename?php"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/aaaphpaaa"))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar//windows.PHP"))
-
-        # "/fish*.php"
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "disallow: /\n"
-            "allow: /fish*.php\n"
-        )
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/bar"))
-
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fish.php"))
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/fishheads/catfish.php?parameters"))
-
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", "http://foo.bar/Fish.PHP"))
-
-        # Section "Order of precedence for group-member records".
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "allow: /p\n"
-            "disallow: /\n"
-        )
-        url = "http://example.com/page"
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "allow: /folder\n"
-            "disallow: /folder\n"
-        )
-        url = "http://example.com/folder/page"
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "allow: /page\n"
-            "disallow: /*.htm\n"
-        )
-        url = "http://example.com/page.htm"
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-
-        robotstxt = (
-            "user-agent: FooBot\n"
-            "allow: /$\n"
-            "disallow: /\n"
-        )
-        url = "http://example.com/"
-        url_page = "http://example.com/page.html"
-        self.assertTrue(self.is_user_agent_allowed(robotstxt, "FooBot", url))
-        self.assertFalse(self.is_user_agent_allowed(robotstxt, "FooBot", url_page))
+        # One subTest per URL: a failure in one fixture doesn't hide the
+        # results of the others.
+        for name, useragent, cases in DOCUMENTATION_CASES:
+            robots = _compile(_FIXTURES[name])
+            for url, expected in cases:
+                with self.subTest(robotstxt=name, url=url):
+                    self.assertEqual(expected, robots.one_agent_allowed_by_robots(useragent, url))
 
 
 if __name__ == "__main__":
@@ -23,21 +23,21 @@
 
 import unittest
 
-from gpyrobotstxt.robotstxtparser import RobotsTxtParser
+from gpyrobotstxt.robotstxtparser import maybe_escape_pattern
 
 
 class TestMaybeEscapePattern(unittest.TestCase):
-    def setUp(self):
-        self.parser = RobotsTxtParser("", self)
-
     def TestEscape(self, url, expected):
-        self.assertEqual(expected, self.parser.maybe_escape_pattern(url))
+        self.assertEqual(expected, maybe_escape_pattern(url))
 
     def test_maybe_escape_pattern(self):
         self.TestEscape("http://www.example.com", "http://www.example.com")
         self.TestEscape("/a/b/c", "/a/b/c")
         self.TestEscape("á", "%C3%A1")
         self.TestEscape("%aa", "%AA")
+        # The parser escapes raw octets, even when they are not valid UTF-8.
+        self.TestEscape(b"/a/\xc3\xa1%aa", b"/a/%C3%A1%AA")
+        self.TestEscape(b"/a/\xff", b"/a/%FF")
 
 
 if __name__ == "__main__":
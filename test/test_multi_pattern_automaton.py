@@ -0,0 +1,61 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# This file checks that the multi-pattern automaton finds the same longest
+# match as the reference pattern matching code found in robots.cc.
+
+import itertools
+import unittest
+
+from gpyrobotstxt.multipatternautomaton import MultiPatternAutomaton
+from gpyrobotstxt.robotsmatchstrategy import RobotsMatchStrategy
+
+
+PATTERNS = ["".join(p) for n in range(4) for p in itertools.product("a/*$", repeat=n)]
+# Every pair of the short patterns, and all of the patterns together.
+PATTERN_SETS = [list(s) for s in itertools.combinations([p for p in PATTERNS if len(p) <= 2], 2)] + [PATTERNS]
+PATHS = ["".join(p) for n in range(6) for p in itertools.product("a/$", repeat=n)]
+
+
+class TestMultiPatternAutomaton(unittest.TestCase):
+    def setUp(self):
+        self.strategy = RobotsMatchStrategy()
+
+    def longest_match(self, path, patterns):
+        return max((len(p) for p in patterns if self.strategy.match_nfa(path, p)), default=-1)
+
+    def test_agrees_with_nfa(self):
+        for patterns in PATTERN_SETS:
+            automaton = MultiPatternAutomaton(patterns)
+            for path in PATHS:
+                self.assertEqual(
+                    self.longest_match(path, patterns),
+                    automaton.run(path),
+                    f"patterns {patterns!r}, path {path!r}",
+                )
+
+    def test_fallback_when_too_many_states(self):
+        automaton = MultiPatternAutomaton(["/*a*b*c*d*e*f*g*h*i*j$", "/*j*i*h*g*f*e*d*c*b*a$"])
+        automaton.kMaxStates = 4
+        self.assertIsNone(automaton.run("/jihgfedcbaabcdefghij"))
+
+    def test_fallback_when_states_too_large(self):
+        automaton = MultiPatternAutomaton(["/*a*b*c*d*e*f*g*h*i*j$", "/*j*i*h*g*f*e*d*c*b*a$"])
+        automaton.kMaxStateBits = 64
+        self.assertIsNone(automaton.run("/jihgfedcbaabcdefghij"))
+
+
+if __name__ == "__main__":
+    unittest.main()
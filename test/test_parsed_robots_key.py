@@ -0,0 +1,55 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# This file checks that robots.txt keys and lines are parsed the same way
+# whether they are given as str or as bytes.
+
+import unittest
+
+from gpyrobotstxt.parsedrobotskey import ParsedRobotsKey
+from gpyrobotstxt.robotstxtparser import RobotsTxtParser
+
+
+class TestParsedRobotsKey(unittest.TestCase):
+    def test_str_and_bytes_keys(self):
+        key = ParsedRobotsKey()
+        for text, key_type in (
+            ("User-Agent", ParsedRobotsKey.KeyType.USER_AGENT),
+            ("user agent", ParsedRobotsKey.KeyType.USER_AGENT),
+            ("Allow", ParsedRobotsKey.KeyType.ALLOW),
+            ("dissalow", ParsedRobotsKey.KeyType.DISALLOW),
+            ("Site-map", ParsedRobotsKey.KeyType.SITEMAP),
+            ("crawl-délai", ParsedRobotsKey.KeyType.UNKNOWN),
+        ):
+            for value in (text, text.encode("utf-8")):
+                with self.subTest(key=value):
+                    key.parse(value)
+                    self.assertEqual(key_type, key.type())
+        self.assertEqual("crawl-délai", key.unknown_key())
+
+        self.assertTrue(key.key_is_user_agent("useragent"))
+        self.assertTrue(key.key_is_allow("ALLOW"))
+        self.assertTrue(key.key_is_disallow(b"disallaw"))
+        self.assertFalse(key.key_is_sitemap("site map"))
+
+    def test_str_and_bytes_lines(self):
+        parser = RobotsTxtParser(b"", None)
+        self.assertEqual(("Disallow", "/á", True), parser.get_key_and_value_from("Disallow: /á # comment"))
+        self.assertEqual((b"Disallow", "/á".encode("utf-8"), True), parser.get_key_and_value_from("Disallow: /á".encode("utf-8")))
+        self.assertEqual(("", "", False), parser.get_key_and_value_from("# comment"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# This file checks that the compiled pattern automaton agrees with the
+# reference pattern matching code found in robots.cc.
+
+import itertools
+import unittest
+from unittest import mock
+
+from gpyrobotstxt.patternautomaton import PatternAutomaton
+from gpyrobotstxt.robotsmatchstrategy import RobotsMatchStrategy
+
+
+PATTERNS = ["".join(p) for n in range(5) for p in itertools.product("a/*$", repeat=n)]
+PATHS = ["".join(p) for n in range(6) for p in itertools.product("a/$", repeat=n)]
+
+
+class TestPatternAutomaton(unittest.TestCase):
+    def setUp(self):
+        self.strategy = RobotsMatchStrategy()
+
+    def test_agrees_with_nfa(self):
+        for pattern in PATTERNS:
+            automaton = PatternAutomaton(pattern)
+            for path in PATHS:
+                self.assertEqual(
+                    self.strategy.match_nfa(path, pattern),
+                    automaton.run(path),
+                    f"pattern {pattern!r}, path {path!r}",
+                )
+
+    def test_pattern_shapes_agree_with_nfa(self):
+        for pattern in PATTERNS:
+            for path in PATHS:
+                self.assertEqual(
+                    self.strategy.match_nfa(path, pattern),
+                    self.strategy.matches(path, pattern),
+                    f"pattern {pattern!r}, path {path!r}",
+                )
+
+    def test_classify_agrees_with_compile(self):
+        for pattern in PATTERNS:
+            shape, text = self.strategy.classify(pattern)
+            compiled_shape, compiled = self.strategy.compile(pattern)
+            self.assertEqual(compiled_shape, shape, pattern)
+            if shape == RobotsMatchStrategy.kGeneralPattern:
+                self.assertEqual(pattern, text)
+            else:
+                self.assertEqual(compiled, text)
+
+    def test_fallback_when_too_many_states(self):
+        pattern = "/*a*b*c*d*e*f*g*h*i*j$"
+        paths = ["/jihgfedcbaabcdefghij", "/abcdefghij", "/abcdefghi", "/jihgfedcba", "/aabbccddeeffgghhiijj/"]
+        # Patched before the strategy builds its automaton for pattern, so
+        # that it gives up on the first path and matches() uses match_nfa().
+        with mock.patch.object(PatternAutomaton, "kMaxStates", 4):
+            strategy = RobotsMatchStrategy()
+            for path in paths:
+                self.assertEqual(strategy.match_nfa(path, pattern), strategy.matches(path, pattern), path)
+            self.assertIsNone(strategy._compiled[pattern][1].run(paths[0]))
+            self.assertTrue(strategy.matches(paths[0], pattern))
+            self.assertFalse(strategy.matches(paths[2], pattern))
+
+
+if __name__ == "__main__":
+    unittest.main()
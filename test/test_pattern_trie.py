@@ -0,0 +1,53 @@
+# Copyright 2023 cocon.se (http://cocon.se/)
+# Copyright 1999 Google LLC
+#
+# Licensed under the GNU General Public License v3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# This file checks that the pattern trie finds the same longest match as the
+# reference pattern matching code found in robots.cc.
+
+import itertools
+import unittest
+
+from gpyrobotstxt.patterntrie import PatternTrie
+from gpyrobotstxt.robotsmatchstrategy import RobotsMatchStrategy
+
+
+# Patterns without wildcards, or with trailing ones only, and with or without
+# a trailing '$'.
+PATTERNS = ["".join(p) + end for n in range(4) for p in itertools.product("a/", repeat=n) for end in ("", "*", "$")]
+PATHS = ["".join(p) for n in range(6) for p in itertools.product("a/", repeat=n)]
+
+
+class TestPatternTrie(unittest.TestCase):
+    def setUp(self):
+        self.strategy = RobotsMatchStrategy()
+
+    def test_agrees_with_nfa(self):
+        for patterns in itertools.combinations(PATTERNS, 2):
+            trie = PatternTrie()
+            for pattern in patterns:
+                if pattern.endswith("$"):
+                    trie.insert_exact(pattern[:-1], len(pattern))
+                else:
+                    trie.insert_prefix(pattern.rstrip("*"), len(pattern))
+            for path in PATHS:
+                self.assertEqual(
+                    max((len(p) for p in patterns if self.strategy.match_nfa(path, p)), default=-1),
+                    trie.longest_match(path),
+                    f"patterns {patterns!r}, path {path!r}",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,7 @@
 
 import unittest
 
+from gpyrobotstxt.parsedrobotskey import ParsedRobotsKey
 from gpyrobotstxt.robots_cc import RobotsMatcher
 from gpyrobotstxt.robotstxtparser import RobotsTxtParser
 
@@ -32,13 +33,13 @@ class RobotsStatsReporter(RobotsMatcher):
         self._last_line_seen = 0
         self._valid_directives = 0
         self._unknown_directives = 0
-        self._sitemap = ""
+        self._sitemaps = []
 
     def handle_robots_start(self):
         self._last_line_seen = 0
         self._valid_directives = 0
         self._unknown_directives = 0
-        self._sitemap = ""
+        self._sitemaps = []
 
     def handle_robots_end(self):
         pass
@@ -54,7 +55,7 @@ class RobotsStatsReporter(RobotsMatcher):
 
     def handle_sitemap(self, line_num, value):
         self.digest(line_num)
-        self._sitemap += value
+        self._sitemaps.append(value)
 
     def handle_unknown_action(self, line_num, action, value):
         self._last_line_seen = line_num
@@ -79,148 +80,125 @@ class RobotsStatsReporter(RobotsMatcher):
 
     @property
     def sitemap(self):
-        return self._sitemap
+        return "".join(self._sitemaps)
+
+
+class RobotsDirectiveStatsReporter(RobotsStatsReporter):
+    # Takes the known directives through handle_directive(), which the parser
+    # calls instead of the per-kind methods.
+    def handle_directive(self, line_num, key_type, value):
+        self.digest(line_num)
+        if key_type == ParsedRobotsKey.KeyType.SITEMAP:
+            self._sitemaps.append(value)
+
+
+_SITEMAP_LOC = "http://foo.bar/sitemap.xml"
+
+_UNIX_FILE = (
+    b"User-Agent: foo\n"
+    b"Allow: /some/path\n"
+    b"User-Agent: bar\n"
+    b"\n"
+    b"\n"
+    b"Disallow: /\n"
+)
+
+# robots.txt bodies used by the tests below, by name. Each one is parsed once
+# per reporter, in setUpClass, and the tests check the resulting reports.
+_FIXTURES = {
+    "unix_file": _UNIX_FILE,
+    "dos_file": _UNIX_FILE.replace(b"\n", b"\r\n"),
+    "mac_file": _UNIX_FILE.replace(b"\n", b"\r"),
+    "no_finale_new_line": _UNIX_FILE[:-1],
+    "mixed_file": (
+        b"User-Agent: foo\n"
+        b"Allow: /some/path\r\n"
+        b"User-Agent: bar\n"
+        b"\r\n"
+        b"\n"
+        b"Disallow: /"
+    ),
+    "utf8_file_full_BOM": b"\xEF\xBB\xBF" b"User-Agent: foo\n" b"Allow: /AnyValue\n",
+    "utf8_file_partial2BOM": b"\xEF\xBB" b"User-Agent: foo\n" b"Allow: /AnyValue\n",
+    "utf8_file_partial1BOM": b"\xEF" b"User-Agent: foo\n" b"Allow: /AnyValue\n",
+    "utf8_file_brokenBOM": b"\xEF\x11\xBF" b"User-Agent: foo\n" b"Allow: /AnyValue\n",
+    "utf8_file_BOM_somewhere_in_middle_of_file": (
+        b"User-Agent: foo\n" b"\xEF\xBB\xBF" b"Allow: /AnyValue\n"
+    ),
+    "sitemap_last": (
+        b"User-Agent: foo\n"
+        b"Allow: /some/path\n"
+        b"User-Agent: bar\n"
+        b"\n"
+        b"\n"
+        b"Sitemap: " + _SITEMAP_LOC.encode() + b"\n"
+    ),
+    "sitemap_first": (
+        b"Sitemap: " + _SITEMAP_LOC.encode() + b"\n"
+        b"User-Agent: foo\n"
+        b"Allow: /some/path\n"
+        b"User-Agent: bar\n"
+        b"\n"
+        b"\n"
+    ),
+}
 
 
 class TestRobotsStatsReporter(unittest.TestCase):
-    def setUp(self):
-        self.report = RobotsStatsReporter()
+    @classmethod
+    def setUpClass(cls):
+        cls.reports = {}
+        for name, robotstxt in _FIXTURES.items():
+            cls.reports[name] = []
+            for reporter in (RobotsStatsReporter, RobotsDirectiveStatsReporter):
+                report = reporter()
+                RobotsTxtParser(robotstxt, report).parse()
+                cls.reports[name].append(report)
+
+    def reports_for(self, name):
+        # Yields the reports of every reporter for the named robots.txt, each
+        # in its own subTest.
+        for report in self.reports[name]:
+            with self.subTest(robotstxt=name, reporter=type(report).__name__):
+                yield report
 
     # Different kinds of line endings are all supported: %x0D / %x0A / %x0D.0A
     def test_ID_LinesNumbersAreCountedCorrectly(self):
-        unix_file = (
-            "User-Agent: foo\n"
-            "Allow: /some/path\n"
-            "User-Agent: bar\n"
-            "\n"
-            "\n"
-            "Disallow: /\n"
-        )
-        parser = RobotsTxtParser(unix_file.encode("UTF-8"), self.report)
-        parser.parse()
-        self.assertEqual(4, self.report.valid_directives)
-        self.assertEqual(6, self.report.last_line_seen)
-
-        dos_file = (
-            "User-Agent: foo\r\n"
-            "Allow: /some/path\r\n"
-            "User-Agent: bar\r\n"
-            "\r\n"
-            "\r\n"
-            "Disallow: /\r\n"
-        )
-        parser = RobotsTxtParser(dos_file.encode("UTF-8"), self.report)
-        parser.parse()
-        self.assertEqual(4, self.report.valid_directives)
-        self.assertEqual(6, self.report.last_line_seen)
-
-        mac_file = (
-            "User-Agent: foo\r\n"
-            "Allow: /some/path\r\n"
-            "User-Agent: bar\r\n"
-            "\r\n"
-            "\r\n"
-            "Disallow: /\r\n"
-        )
-        parser = RobotsTxtParser(mac_file.encode("UTF-8"), self.report)
-        parser.parse()
-        self.assertEqual(4, self.report.valid_directives)
-        self.assertEqual(6, self.report.last_line_seen)
-
-        no_finale_new_line = (
-            "User-Agent: foo\n"
-            "Allow: /some/path\n"
-            "User-Agent: bar\n"
-            "\n"
-            "\n"
-            "Disallow: /"
-        )
-        parser = RobotsTxtParser(no_finale_new_line.encode("UTF-8"), self.report)
-        parser.parse()
-        self.assertEqual(4, self.report.valid_directives)
-        self.assertEqual(6, self.report.last_line_seen)
-
-        mixed_file = (
-            "User-Agent: foo\n"
-            "Allow: /some/path\r\n"
-            "User-Agent: bar\n"
-            "\r\n"
-            "\n"
-            "Disallow: /"
-        )
-        parser = RobotsTxtParser(mixed_file.encode("UTF-8"), self.report)
-        parser.parse()
-        self.assertEqual(4, self.report.valid_directives)
-        self.assertEqual(6, self.report.last_line_seen)
+        for name in ("unix_file", "dos_file", "mac_file", "no_finale_new_line", "mixed_file"):
+            for report in self.reports_for(name):
+                self.assertEqual(4, report.valid_directives)
+                self.assertEqual(6, report.last_line_seen)
 
     # BOM characters are unparseable and thus skipped. The rules following the line are used.
     def test_ID_UTF8ByteOrderMarkIsSkipped(self):
-        utf8_file_full_BOM = b"\xEF\xBB\xBF" b"User-Agent: foo\n" b"Allow: /AnyValue\n"
-        parser = RobotsTxtParser(utf8_file_full_BOM, self.report)
-        parser.parse()
-        self.assertEqual(2, self.report.valid_directives)
-        self.assertEqual(0, self.report.unknown_directives)
-
-        utf8_file_partial2BOM = b"\xEF\xBB" b"User-Agent: foo\n" b"Allow: /AnyValue\n"
         # We allow as well partial ByteOrderMarks.
-        parser = RobotsTxtParser(utf8_file_partial2BOM, self.report)
-        parser.parse()
-        self.assertEqual(2, self.report.valid_directives)
-        self.assertEqual(0, self.report.unknown_directives)
-
-        utf8_file_partial1BOM = b"\xEF" b"User-Agent: foo\n" b"Allow: /AnyValue\n"
-        parser = RobotsTxtParser(utf8_file_partial1BOM, self.report)
-        parser.parse()
-        self.assertEqual(2, self.report.valid_directives)
-        self.assertEqual(0, self.report.unknown_directives)
+        for name in ("utf8_file_full_BOM", "utf8_file_partial2BOM", "utf8_file_partial1BOM"):
+            for report in self.reports_for(name):
+                self.assertEqual(2, report.valid_directives)
+                self.assertEqual(0, report.unknown_directives)
 
         # If the BOM is not the right sequence, the first line looks like garbage
         # that is skipped.
-        utf8_file_brokenBOM = b"\xEF\x11\xBF" b"User-Agent: foo\n" b"Allow: /AnyValue\n"
-        parser = RobotsTxtParser(utf8_file_brokenBOM, self.report)
-        parser.parse()
-        self.assertEqual(1, self.report.valid_directives)
-        self.assertEqual(1, self.report.unknown_directives)
+        for report in self.reports_for("utf8_file_brokenBOM"):
+            self.assertEqual(1, report.valid_directives)
+            self.assertEqual(1, report.unknown_directives)
 
         # Some other messed up file: BOMs only valid in the beginning of the file.
-        utf8_file_BOM_somewhere_in_middle_of_file = (
-            b"User-Agent: foo\n" b"\xEF\xBB\xBF" b"Allow: /AnyValue\n"
-        )
-        parser = RobotsTxtParser(utf8_file_BOM_somewhere_in_middle_of_file, self.report)
-        parser.parse()
-        self.assertEqual(1, self.report.valid_directives)
-        self.assertEqual(1, self.report.unknown_directives)
+        for report in self.reports_for("utf8_file_BOM_somewhere_in_middle_of_file"):
+            self.assertEqual(1, report.valid_directives)
+            self.assertEqual(1, report.unknown_directives)
 
     # Google specific: the RFC allows any line that crawlers might need, such as
     # sitemaps, which Google supports.
     # See REP RFC section "Other records".
     # https://www.rfc-editor.org/rfc/rfc9309.html#section-2.2.4
     def test_ID_NonStandardLineExample_Sitemap(self):
-        sitemap_loc = "http://foo.bar/sitemap.xml"
-        robotstxt = (
-            "User-Agent: foo\n"
-            "Allow: /some/path\n"
-            "User-Agent: bar\n"
-            "\n"
-            "\n"
-            "Sitemap: " + sitemap_loc + "\n"
-        )
-        parser = RobotsTxtParser(robotstxt.encode("UTF-8"), self.report)
-        parser.parse()
-        self.assertEqual(sitemap_loc, self.report.sitemap)
+        for report in self.reports_for("sitemap_last"):
+            self.assertEqual(_SITEMAP_LOC, report.sitemap)
 
         # A sitemap line may appear anywhere in the file.
-        robotstxt = (
-            "Sitemap: " + sitemap_loc + "\n"
-            "User-Agent: foo\n"
-            "Allow: /some/path\n"
-            "User-Agent: bar\n"
-            "\n"
-            "\n"
-        )
-        parser = RobotsTxtParser(robotstxt.encode("UTF-8"), self.report)
-        parser.parse()
-        self.assertEqual(sitemap_loc, self.report.sitemap)
+        for report in self.reports_for("sitemap_first"):
+            self.assertEqual(_SITEMAP_LOC, report.sitemap)
 
 
 if __name__ == "__main__":